@@ -0,0 +1,276 @@
+"""
+Read-only HTTP API serving the dashboard series (equity, PnL, rollups) per user.
+
+Endpoints (GET):
+    /users                                  valid users
+    /users/<user>/<series>                  series: daily, weekly, monthly, quarterly
+        ?strategy=Total_Account             strategy view (default Total_Account)
+        &start=2023-01-01                   start date (default: full history)
+        &format=json|arrow                  JSON records (default) or Arrow IPC stream
+
+Responses carry an ETag derived from the data version and the request, so pollers sending
+If-None-Match get a 304 without a body. Bodies are gzipped for clients that accept it.
+The raw history is kept per user for CACHE_TTL seconds and derived frames / encoded bodies
+are cached as well, so repeated polls don't touch the database or re-encode anything.
+If API_TOKEN is set, requests need "Authorization: Bearer <token>". It is required unless the
+server is bound to a loopback address.
+
+Usage:
+    python api_server.py [--host 127.0.0.1] [--port 8600]
+"""
+import argparse
+import gzip
+import hashlib
+import hmac
+import io
+import ipaddress
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+import config
+from db_utils import fetch_data
+from data_processing import data_version
+from dashboard_data import DerivedFrames, FrameCache
+from snapshots import read_snapshot
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 600
+MAX_RESPONSES = 256
+
+# Series name -> derived frame, and the columns served
+SERIES = {
+    'daily': 'proc',
+    'weekly': 'weekly',
+    'monthly': 'monthly',
+    'quarterly': 'quarterly',
+}
+COLUMNS = ['date_world', 'equity', 'net_pnl', 'cum_pnl', 'total_pnl', 'deposit', 'withdrawal', 'btc_pnl', 'eth_pnl']
+
+CONTENT_TYPES = {
+    'json': "application/json",
+    'arrow': "application/vnd.apache.arrow.stream",
+}
+
+
+def encode_json(df: pd.DataFrame) -> bytes:
+    return df.to_json(orient='records', date_format='iso').encode()
+
+
+def encode_arrow(df: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+ENCODERS = {
+    'json': encode_json,
+    'arrow': encode_arrow,
+}
+
+
+class SeriesService():
+    '''
+    Loads, processes and encodes the series, with the caches described in the module docstring.
+    Thread-safe; independent of HTTP so it can be used directly.
+    '''
+
+    def __init__(self, ttl: float = CACHE_TTL, max_responses: int = MAX_RESPONSES):
+        self.ttl = ttl
+        self.max_responses = max_responses
+        self.frames = FrameCache(config.get_frame_cache_mb() * 1024 * 1024)
+        self._raw = {}
+        self._responses = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _user_lock(self, user):
+        with self._lock:
+            return self._locks.setdefault(user, threading.Lock())
+
+    def raw(self, user: str):
+        """
+        (raw frame, data version, snapshot) of a user, reloaded after `ttl` seconds.
+        Concurrent requests for the same user wait for a single load.
+        """
+        with self._user_lock(user):
+            entry = self._raw.get(user)
+            if entry is None or time.time() - entry['loaded_at'] > self.ttl:
+                table_name = config.get_table_name(user)
+                df = fetch_data(user, table_name=table_name)
+                # The frame is shared by all handler threads, so it is converted here, before
+                # it is published, and never written afterwards
+                if not df.empty:
+                    df['date_world'] = pd.to_datetime(df['date_world'])
+                version = data_version(df)
+                if entry is not None and entry['version'] == version:
+                    # Unchanged data: keep the frame (and its snapshot check)
+                    entry['loaded_at'] = time.time()
+                else:
+                    snapshot = read_snapshot(user, table_name, df) if config.get_use_snapshots() else None
+                    strategies = {"Total_Account", *df['strategy'].unique()} if not df.empty else {"Total_Account"}
+                    entry = {'df': df, 'version': version, 'snapshot': snapshot, 'strategies': strategies,
+                             'loaded_at': time.time()}
+                    self._raw[user] = entry
+            return entry['df'], entry['version'], entry['snapshot']
+
+    def strategies(self, user: str) -> set:
+        """
+        Strategies of the user's loaded history, plus Total_Account.
+        """
+        self.raw(user)
+        with self._user_lock(user):
+            return self._raw[user]['strategies']
+
+    def etag(self, version: str, user: str, series: str, strategy: str, start, fmt: str) -> str:
+        key = repr((version, user, series, strategy, str(start), fmt))
+        return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+    def body(self, etag: str, raw, series: str, strategy: str, start, fmt: str, compress: bool = False) -> bytes:
+        """
+        Encoded (and optionally gzipped) series for the given ETag, computed from `raw`
+        (the result of raw() the ETag was made from) and cached in an LRU of MAX_RESPONSES bodies.
+        """
+        key = (etag, compress)
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+
+        if compress:
+            body = gzip.compress(self.body(etag, raw, series, strategy, start, fmt), compresslevel=5)
+        else:
+            df, version, snapshot = raw
+            if df.empty:
+                frame = pd.DataFrame(columns=COLUMNS)
+            else:
+                frames = DerivedFrames(df, version, memo=self.frames, strategy=strategy,
+                                       start_date=start, snapshot=snapshot)
+                frame = frames.get(SERIES[series])
+                frame = frame[[c for c in COLUMNS if c in frame.columns]]
+            body = ENCODERS[fmt](frame)
+
+        with self._lock:
+            self._responses[key] = body
+            while len(self._responses) > self.max_responses:
+                self._responses.popitem(last=False)
+        return body
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send(status, json.dumps({'error': message}).encode())
+
+    def do_GET(self):
+        token = config.get_api_token()
+        if token and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+            return self._error(401, "Unauthorized")
+
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        users = config.get_valid_users()
+
+        if parts == ["users"]:
+            return self._send(200, json.dumps(users).encode())
+        if len(parts) != 3 or parts[0] != "users":
+            return self._error(404, "Not found")
+
+        user, series = parts[1], parts[2]
+        fmt = params.get('format', 'json')
+        strategy = params.get('strategy', "Total_Account")
+        if user not in users:
+            return self._error(404, f"Unknown user: {user}")
+        if series not in SERIES:
+            return self._error(404, f"Unknown series: {series}")
+        if fmt not in ENCODERS:
+            return self._error(400, f"Unknown format: {fmt}")
+        try:
+            start = pd.Timestamp(params['start']).date() if 'start' in params else None
+        except ValueError:
+            return self._error(400, f"Invalid start date: {params['start']}")
+
+        try:
+            raw = self.service.raw(user)
+            if strategy not in self.service.strategies(user):
+                return self._error(404, f"Unknown strategy: {strategy}")
+            etag = self.service.etag(raw[1], user, series, strategy, start, fmt)
+            headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+            if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                return self._send(304, headers=headers)
+
+            compress = "gzip" in self.headers.get("Accept-Encoding", "")
+            body = self.service.body(etag, raw, series, strategy, start, fmt, compress=compress)
+            if compress:
+                headers["Content-Encoding"] = "gzip"
+            self._send(200, body, CONTENT_TYPES[fmt], headers)
+        except Exception as e:
+            logger.error(f"Error serving {self.path}: {e}")
+            self._error(500, "Internal error")
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8600, service: SeriesService = None) -> ThreadingHTTPServer:
+    if not config.get_api_token() and not is_loopback(host):
+        raise ValueError(f"API_TOKEN must be set to serve on {host} (only loopback addresses may run without auth)")
+    handler = type("Handler", (APIHandler,), {'service': service or SeriesService()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    try:
+        server = make_server(args.host, args.port)
+    except ValueError as e:
+        parser.error(str(e))
+    logger.info(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,37 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from db_utils import get_connection, fetch_data, verify_user, update_user_password
-from data_processing import process_account_data, resample_data, calculate_monthly_heatmap_data
+from db_utils import (get_connection, fetch_data, verify_user, update_user_password, get_online_stats,
+                      get_strategies, get_kpi_summary, get_table_stamp)
+from data_processing import data_version
+from dashboard_data import DerivedFrames, FrameCache
+from snapshots import read_snapshot, snapshot_created
+from cache_warmer import CacheWarmer
+from exports import FORMATS, export_file, export_key, read_export
+from online_stats import OnlineStats
+from price_history import load_price_history, benchmark_equity, benchmark_metrics
+from projection import project_equity_bands
+from attribution import attribution_by_strategy, attribution_for_view
+from overview import PERIODS, DEFAULT_PERIOD, summarize_user, build_overview
+from charts import (pnl_bar_spec, subplot_spec, stacked_bar_spec, stacked_area_spec, heatmap_spec,
+                    balance_spec, figure_json, figure_from_json)
+import perf
+import time
 from datetime import datetime
 
 # Page config
 import config
 
+# The core modules (config, db_utils, data_loading, ...) don't use Streamlit;
+# errors they log are shown on the page through this adapter
+import streamlit_adapter
+streamlit_adapter.install()
+
 # Page config
 st.set_page_config(page_title="Account Dashboard", layout="wide")
 
+# Render timings (shown to admins in the sidebar)
+perf.start_run()
+
 
 # Dark/Light Mode Toggle
 
@@ -32,31 +52,33 @@ def check_login(username, password):
     authenticated, role = verify_user(user_key, username, password)
     return role if authenticated else None
 
-if not st.session_state['authenticated']:
-    # Show Login Form
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        st.title("Login")
+# Auth check (timed for the admin panel)
+with perf.stage("Auth check"):
+    if not st.session_state['authenticated']:
+        # Show Login Form
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            st.title("Login")
         
-        # Add some spacing
-        st.markdown("<br>", unsafe_allow_html=True)
+            # Add some spacing
+            st.markdown("<br>", unsafe_allow_html=True)
         
-        username_input = st.text_input("Username")
-        password_input = st.text_input("Password", type="password")
+            username_input = st.text_input("Username")
+            password_input = st.text_input("Password", type="password")
         
-        login_btn = st.button("Login", type="primary", use_container_width=True)
+            login_btn = st.button("Login", type="primary", use_container_width=True)
         
-        if login_btn:
-            role = check_login(username_input, password_input)
-            if role:
-                st.session_state['authenticated'] = True
-                st.session_state['role'] = role
-                st.session_state['username'] = username_input
-                st.rerun()
-            else:
-                st.error("Invalid Username or Password")
+            if login_btn:
+                role = check_login(username_input, password_input)
+                if role:
+                    st.session_state['authenticated'] = True
+                    st.session_state['role'] = role
+                    st.session_state['username'] = username_input
+                    st.rerun()
+                else:
+                    st.error("Invalid Username or Password")
     
-    st.stop() # Stop execution if not authenticated
+        st.stop() # Stop execution if not authenticated
 
 # Sidebar content starts here
 dark_mode = st.sidebar.toggle("Dark Mode", value=True)
@@ -162,15 +184,9 @@ else:
 
 st.markdown(css, unsafe_allow_html=True)
 
-# Chart Colors based on Mode
-if dark_mode:
-    chart_font_color = "#ffffff"
-    chart_grid_color = "LightGray"
-    chart_bg_color = "rgba(0,0,0,0)"
-else:
-    chart_font_color = "#333333" # Dark gray text for light backgrounds
-    chart_grid_color = "#e5e5e5" # Light grid for light backgrounds
-    chart_bg_color = "#ffffff"    # white chart background requested
+# Chart theme based on Mode: a plotly template swapped into the (cached) figures,
+# see charts.TEMPLATES (dark: white text; light: dark gray text, light grid, white background)
+chart_theme = "dark" if dark_mode else "light"
 
 # Helper for metric cards
 def metric_card(label, value, delta=None):
@@ -180,7 +196,7 @@ def metric_card(label, value, delta=None):
 
 # --- Sidebar ---
 # Helper function to run data loading for a single exchange
-from data_loading import run_data_loading
+from data_loading import run_data_loading, run_price_update
 
 
 # --- Sidebar ---
@@ -201,58 +217,267 @@ else:
     # Admin sees all
     pass
 
-selected_user = st.sidebar.selectbox("User", user_options, index=0)
+# Admins can switch to an overview of all users side by side
+view = "Dashboard"
+if st.session_state['role'] == 'admin':
+    view = st.sidebar.radio("View", ["Dashboard", "All Users"], horizontal=True)
+
+selected_user = st.sidebar.selectbox("User", user_options, index=0, disabled=(view == "All Users"))
+
+# Caching
+# Raw data and online stats are cached per (user, table); everything derived from the data is
+# cached per data version. Writing a user's data only evicts that user's entries (see
+# invalidate_user_data), so the warm caches of other users and sessions are kept.
+
+# Server-wide data generation per (user, table), bumped on every invalidation.
+# Sessions compare it with the generation of the frame they hold.
+@st.cache_resource
+def data_generations():
+    return {}
 
 # Load data for selected user
+# Returns the raw frame and its data version (content hash, computed once per cache miss)
+DATA_TTL = 600
+
+@st.cache_data(ttl=DATA_TTL)
+def load_data(user, table_name):
+    perf.annotate("cache miss")
+    df = fetch_data(user, table_name=table_name)
+    return df, data_version(df)
+
+# Every cache_data hit returns an unpickled copy of the frame, which is the most expensive
+# step of a rerun for large accounts. Reruns that cannot change the data (dark mode, strategy,
+# start date, ...) therefore re-use the frame kept in the session until the cache TTL is over
+# or the user's data was invalidated.
+def get_raw_data(user, ttl=600):
+    table_name = config.get_table_name(user)
+    generation = data_generations().get((user, table_name), 0)
+    entry = st.session_state.get('raw_data')
+    if (entry is not None and entry['key'] == (user, table_name, generation)
+            and time.time() - entry['loaded_at'] <= ttl):
+        with perf.stage("load_data", detail="session"):
+            return entry['df'], entry['version']
+
+    # load_data overrides the detail on a cache miss
+    with perf.stage("load_data", detail="cache hit"):
+        df, version = load_data(user, table_name)
+    st.session_state['raw_data'] = {'key': (user, table_name, generation), 'df': df, 'version': version, 'loaded_at': time.time()}
+    return df, version
+
+# Online statistics are maintained incrementally by the data loader, so reading them needs no history scan
+@st.cache_data(ttl=600)
+def load_online_stats(user, table_name):
+    states = get_online_stats(user, table_name)
+    rows = [dict(Strategy=strategy, **OnlineStats.from_json(state).summary()) for strategy, state in states.items()]
+    return pd.DataFrame(rows)
+
+# Benchmark prices come from the price_history table only (filled by the data loader / daily update).
+# Kept as one shared read-only frame with its data version, so reruns neither copy nor re-hash it.
+@st.cache_resource(ttl=600)
+def load_prices():
+    prices = load_price_history()
+    return prices, data_version(prices)
+
+# Benchmark metrics, cached per (data version, view, price version) like the figures
+@st.cache_data(ttl=600, max_entries=200)
+def load_benchmark_metrics(dataset_version, _proc_df, _prices, pnl_col):
+    return benchmark_metrics(_proc_df, _prices, pnl_col=pnl_col)
+
+# Monte Carlo bands are expensive (tens of thousands of paths), so they are cached per
+# (user, strategy, data version); the pnl series itself is not hashed (leading underscore)
+@st.cache_data(ttl=3600, max_entries=20)
+def load_projection(user, strategy, version, _net_pnl, last_equity, last_date, horizon=90):
+    return project_equity_bands(_net_pnl, last_equity, last_date, horizon=horizon)
+
+# BTC / ETH / residual split per strategy and period, cached per data version
+@st.cache_data(ttl=600, max_entries=50)
+def load_attribution(user, version, freq, start_date, _raw_df):
+    return attribution_by_strategy(_raw_df, freq, start_date)
+
+# Progressive rendering: strategy names and KPIs come from small queries, so the sidebar,
+# header and KPI row are shown before the full history is loaded
 @st.cache_data(ttl=600)
-def load_data(user):
+def load_strategies(user, table_name):
+    return get_strategies(user, table_name)
+
+# Keyed by the user's data generation, so it follows invalidate_user_data like the raw data
+@st.cache_data(ttl=600, max_entries=200)
+def load_kpi_summary(user, table_name, strategy, start_date, generation):
+    return get_kpi_summary(user, table_name, start_date, None if strategy == "Total_Account" else strategy)
+
+# Memo of the derived dashboard frames (processed, filtered, resampled, heatmap), shared by all sessions
+@st.cache_resource
+def frame_cache():
+    return FrameCache(config.get_frame_cache_mb() * 1024 * 1024)
+
+# Snapshot written to the database by daily_update.py, checked once per data version against
+# the loaded history (None if missing or stale). Shared by all sessions, not copied.
+# Also keyed by the user's data generation: a new snapshot of the same data doesn't change the
+# version, so invalidate_user_data re-reads this user's snapshot without touching the others.
+@st.cache_resource(ttl=600, max_entries=20)
+def load_snapshot(user, table_name, version, generation, _raw_df):
+    return read_snapshot(user, table_name, _raw_df)
+
+def invalidate_user_data(user):
+    # Evicts the cached raw data and online stats of one user and makes every session
+    # reload it. Caches keyed by data version need no eviction: new data has a new version.
+    table_name = config.get_table_name(user)
+    load_data.clear(user, table_name)
+    load_online_stats.clear(user, table_name)
+    load_strategies.clear(user, table_name)
+    generations = data_generations()
+    generations[(user, table_name)] = generations.get((user, table_name), 0) + 1
+
+# Overview row of one user (balance, period PnL, equity sparkline). Only the small summary is
+# cached, keyed by the data generation like the KPIs, so warm reruns don't copy any history.
+@st.cache_data(ttl=600, max_entries=200)
+def load_user_overview(user, table_name, period, generation):
+    df, version = load_data(user, table_name)
+    snapshot = load_snapshot(user, table_name, version, generation, df) if config.get_use_snapshots() else None
+    frames = DerivedFrames(df, version, memo=frame_cache(), snapshot=snapshot)
+    return summarize_user(frames.get('proc'), period)
+
+# Default view of the start date inputs (the view the cache warm-up prepares)
+DEFAULT_START_DATE = datetime(2023, 1, 1).date()
+
+def warm_user(user):
+    # Fills the caches a first session of `user` needs: raw data, snapshot, the derived frames
+    # of the default view, strategies, KPIs, online stats and the overview row
+    table_name = config.get_table_name(user)
+    generation = data_generations().get((user, table_name), 0)
+    df, version = load_data(user, table_name)
+    snapshot = load_snapshot(user, table_name, version, generation, df) if config.get_use_snapshots() else None
+    frames = DerivedFrames(df, version, memo=frame_cache(), start_date=DEFAULT_START_DATE, snapshot=snapshot)
+    for name in ['proc', 'weekly', 'monthly', 'quarterly', 'heatmap']:
+        frames.get(name)
+    load_strategies(user, table_name)
+    load_kpi_summary(user, table_name, "Total_Account", DEFAULT_START_DATE, generation)
+    load_online_stats(user, table_name)
+    load_user_overview(user, table_name, DEFAULT_PERIOD, generation)
+
+def data_stamp(user):
+    # Changes when rows are loaded (last day / row count of the table) or a new snapshot is written
     table_name = config.get_table_name(user)
-    return fetch_data(user, table_name=table_name)
+    return get_table_stamp(user, table_name), snapshot_created(user, table_name)
+
+# One warm-up thread per server for the users listed in CACHE_WARM_USERS. It re-warms a user
+# when the data stamp changes (dropping the cached data first) and two polls before the cached
+# data expires (load_data ttl), so the re-warm replaces the entries before they run out.
+@st.cache_resource
+def cache_warmer():
+    poll = config.get_cache_warm_interval()
+    warmer = CacheWarmer(config.get_cache_warm_users(), warm_user, stamp=data_stamp,
+                         invalidate=invalidate_user_data,
+                         poll=poll, refresh=max(poll, DATA_TTL - 2 * poll))
+    if warmer.users:
+        warmer.start()
+    return warmer
+
+cache_warmer()
+
+# --- All Users Overview (Admin only) ---
+if view == "All Users":
+    st.markdown("""
+        <div style="background-color: #3498db; padding: 10px; border-radius: 5px; margin-bottom: 20px;">
+            <h2 style="color: white; margin: 0; font-size: 20px;">Account Dashboard - All Users</h2>
+        </div>
+    """, unsafe_allow_html=True)
+
+    overview_period = st.radio("Period", list(PERIODS), format_func=PERIODS.get, horizontal=True,
+                               index=list(PERIODS).index(DEFAULT_PERIOD))
+
+    # Users are loaded and processed concurrently, so the page takes about as long as the
+    # slowest user rather than the sum of all users
+    all_users = config.get_valid_users()
+    generations = data_generations()
+
+    def user_overview(user):
+        table_name = config.get_table_name(user)
+        return load_user_overview(user, table_name, overview_period, generations.get((user, table_name), 0))
+
+    overview_df = build_overview(all_users, user_overview)
+
+    st.dataframe(
+        overview_df,
+        hide_index=True,
+        width="stretch",
+        column_config={
+            'Balance': st.column_config.NumberColumn("Balance (USD)", format="%.2f"),
+            'Period PnL': st.column_config.NumberColumn(f"PnL {PERIODS[overview_period]} (USD)", format="%.2f"),
+            'Period Return (%)': st.column_config.NumberColumn("Return (%)", format="%.2f"),
+            'Equity': st.column_config.LineChartColumn(f"Equity ({PERIODS[overview_period]})"),
+        },
+    )
 
-raw_df = load_data(selected_user)
+    if st.sidebar.button("UPDATE GRAPHS", width="stretch", type="primary"):
+        for user in all_users:
+            invalidate_user_data(user)
+        st.rerun()
 
-if raw_df.empty:
-    st.error("No data found for the selected user.")
+    perf.end_run()
+    if st.session_state['role'] == 'admin':
+        perf.timing_panel(st.sidebar.empty())
     st.stop()
 
+selected_table = config.get_table_name(selected_user)
+progressive = config.get_progressive_rendering()
+strategy_names = load_strategies(selected_user, selected_table) if progressive else []
+
+if not strategy_names:
+    # Classic mode (or the strategy query failed): the history is loaded up front
+    progressive = False
+    raw_df, raw_version = get_raw_data(selected_user)
+    if raw_df.empty:
+        st.error("No data found for the selected user.")
+        st.stop()
+    strategy_names = sorted(raw_df['strategy'].unique().tolist())
+
 # Strategy Selection
-strategies = ["Total_Account"] + sorted(raw_df['strategy'].unique().tolist())
+strategies = ["Total_Account"] + strategy_names
 if st.session_state['role'] == 'admin':
     selected_strategy = st.sidebar.selectbox("Strategy", strategies)
 else:
     selected_strategy = "Total_Account"
 
 # Prototype-like Date Selection
-min_date = pd.to_datetime(raw_df['date_world']).min().to_pydatetime()
-max_date = pd.to_datetime(raw_df['date_world']).max().to_pydatetime()
-
 st.sidebar.markdown("**Start date (month / year)**")
 col_m, col_y = st.sidebar.columns(2)
 with col_m:
     # Set default start month to 1 and ensure it's selectable back to Jan
-    start_month = st.number_input("Start Month", min_value=1, max_value=12, value=1, key="sm", label_visibility="collapsed")
+    start_month = st.number_input("Start Month", min_value=1, max_value=12, value=DEFAULT_START_DATE.month, key="sm", label_visibility="collapsed")
 with col_y:
     # Set earliest start year to 2023 and default to 2023
-    start_year = st.number_input("Start Year", min_value=2023, max_value=2030, value=2023, key="sy", label_visibility="collapsed")
+    start_year = st.number_input("Start Year", min_value=2023, max_value=2030, value=DEFAULT_START_DATE.year, key="sy", label_visibility="collapsed")
 
 st.sidebar.caption("(dates always beginning of month)")
 
+# Graph toggles: name -> (label, admin default, forced default for 'user' role)
+GRAPH_TOGGLES = {
+    "balance": ("Balance", True, True),
+    "daily": ("Show Daily Charts", True, False),
+    "weekly": ("Show Weekly Charts", True, False),
+    "monthly": ("Show Monthly Charts", True, True),
+    "quarterly": ("Show Quarterly Charts", True, False),
+    "strategy_breakdown": ("Show Strategy Breakdown", True, False),
+    "benchmark": ("Benchmark (BTC/ETH)", False, False),
+    "projection": ("Projection Bands (90d)", False, False),
+    "attribution": ("Show PnL Attribution", False, False),
+}
+
+# The checkboxes are drawn by the chart fragments further down, so toggling a chart only
+# reruns that chart's fragment. Here we just reserve their places in the sidebar (fragments
+# drawing widgets into containers outside them need Streamlit >= 1.59, see requirements.txt).
+graph_slots = {}
 if st.session_state['role'] == 'admin':
     st.sidebar.markdown("### Graph Selection")
-    show_balance = st.sidebar.checkbox("Balance", value=True)
-    show_daily_charts = st.sidebar.checkbox("Show Daily Charts", value=True)
-    show_weekly_charts = st.sidebar.checkbox("Show Weekly Charts", value=True)
-    show_monthly_charts = st.sidebar.checkbox("Show Monthly Charts", value=True)
-    show_quarterly_charts = st.sidebar.checkbox("Show Quarterly Charts", value=True)
-    show_strategy_breakdown = st.sidebar.checkbox("Show Strategy Breakdown", value=True)
-else:
-    # Forced defaults for 'user' role
-    show_balance = True
-    show_daily_charts = False
-    show_weekly_charts = False
-    show_monthly_charts = True
-    show_quarterly_charts = False
-    show_strategy_breakdown = False
+    graph_slots = {name: st.sidebar.empty() for name in GRAPH_TOGGLES}
+
+def graph_toggle(name):
+    # Admins get a checkbox in the reserved slot, users the forced default
+    label, admin_default, user_default = GRAPH_TOGGLES[name]
+    if name in graph_slots:
+        return graph_slots[name].checkbox(label, value=admin_default, key=f"show_{name}")
+    return user_default
 # User request: "please always use the default and remove the exclude the exclude deposits checkbox"
 # Default was Exclude Deposits = True, so we always use net_pnl
 exclude_deposits = True 
@@ -260,7 +485,9 @@ exclude_deposits = True
 # Update Button
 # Update Button
 if st.sidebar.button("UPDATE GRAPHS", width="stretch", type="primary"):
-    st.cache_data.clear()
+    invalidate_user_data(selected_user)
+    # The price store is shared and may have been updated by the daily job
+    load_prices.clear()
     st.rerun()
 
 # --- Data Loader ---
@@ -302,6 +529,8 @@ if st.session_state['role'] == 'admin':
             exchanges_to_run.append(loader_exchange)
         
         # Execution Loop
+        # (the loaders derive PnL from the existing history)
+        raw_df, raw_version = get_raw_data(selected_user)
         any_success = False
         
         for ex in exchanges_to_run:
@@ -311,9 +540,17 @@ if st.session_state['role'] == 'admin':
                 any_success = True
             else:
                 st.sidebar.error(msg)
+
+        # Refresh the benchmark price store (the charts only read it)
+        success, msg = run_price_update(selected_user)
+        if success:
+            st.sidebar.success(msg)
+            load_prices.clear()
+        else:
+            st.sidebar.warning(msg)
                 
         if any_success:
-            st.cache_data.clear()
+            invalidate_user_data(selected_user)
             # st.rerun() # Rerun immediately can cut off other messages. Use session state?
             # Actually, if we rerun, we lose the other messages. 
             # Better: Set a flag and rerun at the end? Or just show messages and let user click Update?
@@ -366,25 +603,18 @@ with st.sidebar.expander("Security Settings"):
                 else:
                     st.error("Incorrect current password.")
 
+# Render timings panel (Admin only), filled at the end of the run
+timing_slot = st.sidebar.empty() if st.session_state['role'] == 'admin' else None
+
 # --- Data Processing (End of Data Loader block logic, but Data Processing is global) ---
 
 
 # --- Data Processing ---
 actual_start_date = datetime(int(start_year), int(start_month), 1).date()
-proc_df = process_account_data(raw_df, selected_strategy)
-# Filter by start date
-proc_df = proc_df[proc_df['date_world'].dt.date >= actual_start_date]
-
-if proc_df.empty:
-    st.warning("No data for the selected start date.")
-    st.stop()
 
 # Determine PnL column based on Exclude Deposits
 pnl_col = 'net_pnl'
 
-# Recalculate cum_pnl for the filtered view so charts start at 0 (or correct accumulated value relative to start date)
-proc_df['cum_pnl'] = proc_df[pnl_col].cumsum()
-
 # --- Main Dashboard ---
 # Custom Header like prototype
 st.markdown(f"""
@@ -394,313 +624,289 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # KPI Row
-latest_data = proc_df.iloc[-1]
-# Calculate total PnL based on selection
-if exclude_deposits:
-    total_pnl = proc_df[pnl_col].sum()
-    daily_pnl = latest_data[pnl_col]
+@perf.timed_fragment("KPI Row")
+def kpi_row(current_balance, total_pnl):
+    kpi_col1, kpi_col2 = st.columns(2)
+    with kpi_col1:
+        st.markdown(f"""
+            <div style="text-align: center; color: white;">
+                <span style="font-weight: bold;">Balance (USD):</span>
+                <span style="margin-left: 50px;">{current_balance:,.2f}</span>
+            </div>
+        """, unsafe_allow_html=True)
+    with kpi_col2:
+        st.markdown(f"""
+            <div style="text-align: center; color: white;">
+                <span style="font-weight: bold;">P&L since {actual_start_date.strftime('%b %Y')}* (USD):</span>
+                <span style="margin-left: 50px;">{total_pnl:,.2f}</span>
+            </div>
+        """, unsafe_allow_html=True)
+
+    # Live Statistics (Admin only)
+    if st.session_state['role'] == 'admin':
+        stats_df = load_online_stats(selected_user, selected_table)
+        if selected_strategy != "Total_Account" and not stats_df.empty:
+            stats_df = stats_df[stats_df['Strategy'] == selected_strategy]
+        if not stats_df.empty:
+            with st.expander("Live Statistics"):
+                st.dataframe(stats_df.style.format(precision=2), hide_index=True, width="stretch")
+
+# Progressive mode: the KPIs are on screen after one small query, the charts follow
+# once the history is loaded and processed
+kpis = None
+if progressive:
+    generation = data_generations().get((selected_user, selected_table), 0)
+    kpis = load_kpi_summary(selected_user, selected_table, selected_strategy, actual_start_date, generation)
+    if kpis is not None:
+        kpi_row(kpis['balance'], kpis['pnl_since_start'])
+
+if progressive:
+    raw_df, raw_version = get_raw_data(selected_user)
+    if raw_df.empty:
+        st.error("No data found for the selected user.")
+        st.stop()
+
+# Derived frames are computed lazily (only for the charts that are shown) and memoized in a
+# server-wide LRU cache keyed by (data version, strategy, start date), bounded in memory.
+# Reruns and other sessions with the same settings re-use them without copying.
+# The daily snapshot provides the processed history and full-history rollups, so only days
+# loaded since the daily update are processed here.
+snapshot = (load_snapshot(selected_user, selected_table, raw_version,
+                          data_generations().get((selected_user, selected_table), 0), raw_df)
+            if config.get_use_snapshots() else None)
+# Frame computations (memo misses) are timed for the admin panel
+FRAME_STAGES = {
+    'processed': "process_account_data",
+    'proc': "Start-date filter",
+    'weekly': "resample_data (W)",
+    'monthly': "resample_data (ME)",
+    'quarterly': "resample_data (QE)",
+    'heatmap': "Heatmap",
+    'strategy_breakdown': "Strategy breakdown pivot",
+}
+def frame_timer(name):
+    return perf.stage(FRAME_STAGES.get(name, name), detail="snapshot" if snapshot is not None else None)
+
+frames = DerivedFrames(raw_df, raw_version, memo=frame_cache(), strategy=selected_strategy,
+                       start_date=actual_start_date, pnl_col=pnl_col, snapshot=snapshot, timer=frame_timer)
+
+# Filtered by start date, with cum_pnl restarting at 0 there
+proc_df = frames.get('proc')
+
+if proc_df.empty:
+    st.warning("No data for the selected start date.")
+    st.stop()
+
+if kpis is None:
+    # Calculate total PnL based on selection (exclude_deposits: always net_pnl)
+    latest_data = proc_df.iloc[-1]
+    kpi_row(latest_data['equity'], proc_df[pnl_col].sum())
+
+# --- Data Export ---
+# Files are only generated when a download button is clicked (on a separate thread, without a
+# rerun), written in chunks and kept per data version, see exports.py
+# Export -> (frame, label, columns); None exports all columns
+EXPORTS = {
+    'raw': ('raw', "Raw Rows", None),
+    'proc': ('proc', "Daily", None),
+    'weekly': ('weekly', "Weekly", None),
+    'monthly': ('monthly', "Monthly", None),
+    'quarterly': ('quarterly', "Quarterly", None),
+}
+# Users only get the data of the charts they are shown (the GRAPH_TOGGLES user defaults),
+# limited to the columns those charts show: no PnL columns hidden from the 'user' role
+USER_EXPORTS = {
+    'balance': ('proc', "Balance", ['date_world', 'equity']),
+    'monthly': ('monthly', "Monthly", ['Month', 'cum_pnl']),
+}
+if st.session_state['role'] == 'admin':
+    exports = EXPORTS
 else:
-    # If using raw total_pnl, usually it assumes the column is cumulative or daily change? 
-    # Logic in data_processing sums total_pnl, so sum is correct if its daily change.
-    total_pnl = proc_df[pnl_col].sum()
-    daily_pnl = latest_data[pnl_col]
-
-current_balance = latest_data['equity']
-
-kpi_col1, kpi_col2 = st.columns(2)
-with kpi_col1:
-    st.markdown(f"""
-        <div style="text-align: center; color: white;">
-            <span style="font-weight: bold;">Balance (USD):</span>
-            <span style="margin-left: 50px;">{current_balance:,.2f}</span>
-        </div>
-    """, unsafe_allow_html=True)
-with kpi_col2:
-    st.markdown(f"""
-        <div style="text-align: center; color: white;">
-            <span style="font-weight: bold;">P&L since {actual_start_date.strftime('%b %Y')}* (USD):</span>
-            <span style="margin-left: 50px;">{total_pnl:,.2f}</span>
-        </div>
-    """, unsafe_allow_html=True)
+    exports = {toggle: export for toggle, export in USER_EXPORTS.items() if GRAPH_TOGGLES[toggle][2]}
+
+def export_data(export_name, frame_name, columns, fmt):
+    def generate():
+        if frame_name == 'raw':
+            df, view = raw_df, export_name
+        else:
+            df = frames.get(frame_name)
+            if columns is not None:
+                df = df[columns]
+            view = export_key(export_name, selected_strategy, actual_start_date, pnl_col, columns)
+        # The view is part of the file name, the data version is the key (see exports.export_file)
+        return read_export(export_file(df, f"{selected_table}_{view}", export_key(raw_version), fmt))
+    return generate
+
+with st.sidebar.expander("Export Data"):
+    export_fmt = st.radio("Format", list(FORMATS), format_func=str.upper, horizontal=True, key="export_fmt")
+    for export_name, (frame_name, label, columns) in exports.items():
+        st.download_button(label, data=export_data(export_name, frame_name, columns, export_fmt),
+                           file_name=f"{selected_user}_{export_name}_{selected_strategy}.{export_fmt}",
+                           mime=FORMATS[export_fmt], on_click="ignore", width="stretch", key=f"export_{export_name}")
 
 st.markdown("---")
 
 # --- Charts (Stacked) ---
 
+# Serialized figures from the chart factory, cached per (dataset version, spec).
+# The dataset version covers the data version and every view setting of the data; the theme
+# is not part of the key since it is applied as a template swap when the figure is shown.
+# `_data` may be a function returning the data, so data only needed for the build (e.g. the
+# benchmark overlays) is not computed on a cache hit.
+@st.cache_data(ttl=600, max_entries=200)
+def load_figure_json(dataset_version, spec, _data):
+    perf.annotate("cache miss")
+    return figure_json(_data() if callable(_data) else _data, spec)
+
+def chart_label(spec):
+    # Name of a chart in the timing panel
+    if spec['kind'] == 'subplots':
+        return " / ".join(panel['title'] for panel in spec['panels'])
+    return spec.get('title') or spec['kind'].replace('_', ' ').title()
+
+def show_figure(dataset_version, spec, data):
+    label = chart_label(spec)
+    with perf.stage(f"Figure build: {label}", detail="cache hit"):
+        fig = figure_from_json(load_figure_json(dataset_version, spec, data), chart_theme)
+    with perf.stage(f"Figure send: {label}"):
+        st.plotly_chart(fig, use_container_width=True, theme=None)
+
+def show_chart(frame_name, spec):
+    dataset_version = (raw_version, frame_name, selected_strategy, actual_start_date, pnl_col)
+    show_figure(dataset_version, spec, frames.get(frame_name))
+
 # 1. Equity Curve (Balance)
-if show_balance:
-    fig_equity = px.area(proc_df, x='date_world', y='equity', 
-                         title="Total Balance", 
-                         color_discrete_sequence=['#3498db'])
-    
-    # Remove Benchmark logic as requested
-
-    fig_equity.update_layout(
-        height=300, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        legend=dict(y=1.1, x=0, orientation='h', font=dict(color=chart_font_color)),
-        font=dict(color=chart_font_color)
-    )
-    fig_equity.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_equity.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_equity.update_traces(hovertemplate="Date: %{x}<br>Balance: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_equity, use_container_width=True, theme=None)
+@perf.timed_fragment("Balance")
+def balance_chart():
+    show_balance = graph_toggle("balance")
+    show_benchmark = graph_toggle("benchmark")
+    show_projection = graph_toggle("projection")
+    if show_balance:
+        # Buy-and-hold benchmarks from the price store and projection bands are overlays of the
+        # cached figure, so the dataset version covers the prices and which overlays are shown
+        prices, prices_version = load_prices() if show_benchmark else (pd.DataFrame(), None)
+        dataset_version = (raw_version, 'balance', selected_strategy, actual_start_date, pnl_col,
+                           prices_version, show_projection)
+
+        def balance_data():
+            bench_df = benchmark_equity(proc_df, prices) if show_benchmark else pd.DataFrame()
+            bands_df = pd.DataFrame()
+            if show_projection:
+                bands_df = load_projection(selected_user, selected_strategy, (raw_version, actual_start_date), proc_df[pnl_col],
+                                           float(proc_df['equity'].iloc[-1]), proc_df['date_world'].iloc[-1])
+            return proc_df, bench_df, bands_df
+
+        if show_benchmark and (prices.empty or proc_df.empty):
+            st.info("No benchmark prices stored yet. Run LOAD DATA to fill the price history.")
+        show_figure(dataset_version, balance_spec(), balance_data)
+
+        if show_benchmark and not prices.empty and not proc_df.empty:
+            metrics_df = load_benchmark_metrics(dataset_version, proc_df, prices, pnl_col)
+            st.dataframe(metrics_df.style.format(precision=2), hide_index=True, width="stretch")
+
+balance_chart()
+
+# PnL + cumulative PnL pair of one period. In combined mode both are panels of one figure
+# with a shared x-axis (one chart element, one layout), otherwise two separate charts.
+def show_pnl_charts(frame_name, x, period, x_label, show_pnl=True):
+    pnl_spec = pnl_bar_spec(x, pnl_col, f"{period} PnL", x_label=x_label)
+    cum_spec = pnl_bar_spec(x, 'cum_pnl', f"Cumulative {period} PnL", x_label=x_label, y_label="Cum PnL", agg='last')
+    specs = [pnl_spec, cum_spec] if show_pnl else [cum_spec]
+    if config.get_combined_charts() and len(specs) > 1:
+        show_chart(frame_name, subplot_spec(specs))
+    else:
+        for spec in specs:
+            show_chart(frame_name, spec)
 
 # 2. Daily Charts
-if show_daily_charts:
-    # Daily PnL
-    fig_daily = px.bar(proc_df, x='date_world', y=pnl_col,
-                     color=pnl_col, 
-                     color_continuous_scale=['red', 'green'], 
-                     color_continuous_midpoint=0,
-                     title="Daily PnL")
-    fig_daily.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        coloraxis_showscale=False,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        title_font_color=chart_font_color
-    )
-    fig_daily.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_daily.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_daily.update_traces(hovertemplate="Date: %{x}<br>PnL: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_daily, use_container_width=True, theme=None)
-    
-    # Cumulative Daily PnL
-    fig_daily_cum = px.bar(proc_df, x='date_world', y='cum_pnl',
-                     color='cum_pnl', 
-                     color_continuous_scale=['red', 'green'], 
-                     color_continuous_midpoint=0,
-                     title="Cumulative Daily PnL")
-    fig_daily_cum.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        coloraxis_showscale=False,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        title_font_color=chart_font_color
-    )
-    fig_daily_cum.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_daily_cum.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_daily_cum.update_traces(hovertemplate="Date: %{x}<br>Cum PnL: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_daily_cum, use_container_width=True, theme=None)
+@perf.timed_fragment("Daily Charts")
+def daily_charts():
+    if graph_toggle("daily"):
+        show_pnl_charts('proc', 'date_world', "Daily", "Date")
+
+daily_charts()
 
 # 3. Weekly Charts
-if show_weekly_charts:
-    weekly_df = resample_data(proc_df, 'W')
-    # Weekly PnL
-    fig_weekly = px.bar(weekly_df, x='date_world', y=pnl_col,
-                 color=pnl_col, 
-                 color_continuous_scale=['red', 'green'], 
-                 color_continuous_midpoint=0,
-                 title="Weekly PnL")
-    fig_weekly.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        coloraxis_showscale=False,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        title_font_color=chart_font_color
-    )
-    fig_weekly.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_weekly.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_weekly.update_traces(hovertemplate="Week: %{x}<br>PnL: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_weekly, use_container_width=True, theme=None)
-    
-    # Cumulative Weekly PnL
-    fig_weekly_cum = px.bar(weekly_df, x='date_world', y='cum_pnl',
-                 color='cum_pnl', 
-                 color_continuous_scale=['red', 'green'], 
-                 color_continuous_midpoint=0,
-                 title="Cumulative Weekly PnL")
-    fig_weekly_cum.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        coloraxis_showscale=False,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        title_font_color=chart_font_color
-    )
-    fig_weekly_cum.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_weekly_cum.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_weekly_cum.update_traces(hovertemplate="Week: %{x}<br>Cum PnL: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_weekly_cum, use_container_width=True, theme=None)
+@perf.timed_fragment("Weekly Charts")
+def weekly_charts():
+    if graph_toggle("weekly"):
+        show_pnl_charts('weekly', 'date_world', "Weekly", "Week")
+
+weekly_charts()
 
 # 4. Monthly Charts
-if show_monthly_charts:
-    monthly_df = resample_data(proc_df, 'ME')
-    # Change date to month name/year for better readability
-    monthly_df['Month'] = monthly_df['date_world'].dt.strftime('%b %Y')
-    
-    # Monthly PnL (Visible only for admin)
-    if st.session_state['role'] == 'admin':
-        fig_monthly = px.bar(monthly_df, x='Month', y=pnl_col,
-                     color=pnl_col, 
-                     color_continuous_scale=['red', 'green'], 
-                     color_continuous_midpoint=0,
-                     title="Monthly PnL")
-        fig_monthly.update_layout(
-            height=250, 
-            margin=dict(l=20, r=20, t=30, b=20),
-            xaxis_title=None, 
-            yaxis_title=None,
-            coloraxis_showscale=False,
-            paper_bgcolor=chart_bg_color,
-            plot_bgcolor=chart_bg_color,
-            font=dict(color=chart_font_color),
-            title_font_color=chart_font_color
-        )
-        fig_monthly.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-        fig_monthly.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-        fig_monthly.update_traces(hovertemplate="Month: %{x}<br>PnL: $%{y:,.2f}<extra></extra>")
-        st.plotly_chart(fig_monthly, use_container_width=True, theme=None)
-    
-    # Cumulative Monthly PnL (Visible for all)
-    fig_monthly_cum = px.bar(monthly_df, x='Month', y='cum_pnl',
-                 color='cum_pnl', 
-                 color_continuous_scale=['red', 'green'], 
-                 color_continuous_midpoint=0,
-                 title="Cumulative Monthly PnL")
-    fig_monthly_cum.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        coloraxis_showscale=False,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        title_font_color=chart_font_color
-    )
-    fig_monthly_cum.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_monthly_cum.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_monthly_cum.update_traces(hovertemplate="Month: %{x}<br>Cum PnL: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_monthly_cum, use_container_width=True, theme=None)
+@perf.timed_fragment("Monthly Charts")
+def monthly_charts():
+    if graph_toggle("monthly"):
+        # Monthly PnL visible only for admin, cumulative monthly PnL for all
+        show_pnl_charts('monthly', 'Month', "Monthly", "Month", show_pnl=st.session_state['role'] == 'admin')
+
+monthly_charts()
 
 # 5. Quarterly Charts
-if show_quarterly_charts:
-    quarterly_df = resample_data(proc_df, 'QE')
-    # Format quarter nicely (e.g., 2023Q1)
-    quarterly_df['Quarter'] = quarterly_df['date_world'].dt.to_period('Q').astype(str)
-    
-    # Quarterly PnL
-    fig_quarterly = px.bar(quarterly_df, x='Quarter', y=pnl_col,
-                 color=pnl_col, 
-                 color_continuous_scale=['red', 'green'], 
-                 color_continuous_midpoint=0,
-                 title="Quarterly PnL")
-    fig_quarterly.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        coloraxis_showscale=False,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        title_font_color=chart_font_color
-    )
-    fig_quarterly.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_quarterly.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_quarterly.update_traces(hovertemplate="Quarter: %{x}<br>PnL: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_quarterly, use_container_width=True, theme=None)
-    
-    # Cumulative Quarterly PnL
-    fig_quarterly_cum = px.bar(quarterly_df, x='Quarter', y='cum_pnl',
-                 color='cum_pnl', 
-                 color_continuous_scale=['red', 'green'], 
-                 color_continuous_midpoint=0,
-                 title="Cumulative Quarterly PnL")
-    fig_quarterly_cum.update_layout(
-        height=250, 
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis_title=None, 
-        yaxis_title=None,
-        coloraxis_showscale=False,
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        title_font_color=chart_font_color
-    )
-    fig_quarterly_cum.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_quarterly_cum.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_quarterly_cum.update_traces(hovertemplate="Quarter: %{x}<br>Cum PnL: $%{y:,.2f}<extra></extra>")
-    st.plotly_chart(fig_quarterly_cum, use_container_width=True, theme=None)
+@perf.timed_fragment("Quarterly Charts")
+def quarterly_charts():
+    if graph_toggle("quarterly"):
+        show_pnl_charts('quarterly', 'Quarter', "Quarterly", "Quarter")
+
+quarterly_charts()
+
+# 6. PnL Attribution (BTC / ETH / Residual)
+@perf.timed_fragment("PnL Attribution")
+def attribution_charts():
+    if graph_toggle("attribution"):
+        attr_periods = {"D": "Daily", "W": "Weekly", "M": "Monthly", "Q": "Quarterly", "Y": "Yearly"}
+        attr_freq = st.radio("Attribution Period", list(attr_periods.keys()), index=2, horizontal=True,
+                             format_func=lambda f: attr_periods[f], key="attr_freq")
+        attr_df = load_attribution(selected_user, raw_version, attr_freq, actual_start_date, raw_df)
+        attr_long = attribution_for_view(attr_df, selected_strategy)
+
+        show_figure((raw_version, 'attribution', attr_freq, selected_strategy, actual_start_date),
+                    stacked_bar_spec('date_world', 'pnl', 'component', f"{attr_periods[attr_freq]} PnL Attribution",
+                                     color_map={'BTC': '#f7931a', 'ETH': '#627eea', 'Residual': '#95a5a6'}),
+                    attr_long)
+
+attribution_charts()
 
 # --- New Feature: Monthly Heatmap ---
 st.markdown("### Monthly Performance Heatmap")
-heatmap_pnl, heatmap_pct = calculate_monthly_heatmap_data(proc_df, pnl_col=pnl_col)
+heatmap_pnl, heatmap_pct = frames.get('heatmap')
 
 if not heatmap_pct.empty:
     # Use Percentage for color and text, but show Absolute PnL on hover
-    fig_heatmap = px.imshow(heatmap_pct, 
-                            labels=dict(x="Month", y="Year", color="Return (%)"),
-                            x=heatmap_pct.columns,
-                            y=heatmap_pct.index,
-                            color_continuous_scale=['red', 'white', 'green'],
-                            color_continuous_midpoint=0,
-                            aspect="auto",
-                            text_auto=".2f",
-                            title="")
-    
-    # Custom Hover Template to show Abs PnL
-    # We need to construct custom data for hover
-    # Plotly imshow matches values by index/col, so we can pass the PnL df as custom_data
-    fig_heatmap.update_traces(
-        customdata=heatmap_pnl.values,
-        hovertemplate="Year: %{y}<br>Month: %{x}<br>Return: %{z:.2f}%<br>PnL: $%{customdata:,.2f}<extra></extra>"
-    )
-    
-    fig_heatmap.update_layout(
-        height=400,
-        title="",
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color)
-    )
-    fig_heatmap.update_xaxes(tickfont=dict(color=chart_font_color))
-    fig_heatmap.update_yaxes(tickfont=dict(color=chart_font_color))
-    fig_heatmap.update_layout(coloraxis_colorbar=dict(tickfont=dict(color=chart_font_color)))
-    st.plotly_chart(fig_heatmap, use_container_width=True, theme=None)
+    show_chart('heatmap', heatmap_spec())
 
 # --- Strategy Comparison ---
-if selected_strategy == "Total_Account" and show_strategy_breakdown:
-    st.subheader("Equity Breakdown by Strategy")
-    # Group raw data by date and strategy to show breakdown
-    strat_df = raw_df[raw_df['date_world'].dt.date >= actual_start_date].copy()
-    fig_strat = px.area(strat_df, x='date_world', y='collateral', color='strategy', 
-                        line_group='strategy', title="")
-    fig_strat.update_layout(
-        height=400, 
-        title="",
-        xaxis_title=None, 
-        yaxis_title="Equity (USD)",
-        paper_bgcolor=chart_bg_color,
-        plot_bgcolor=chart_bg_color,
-        font=dict(color=chart_font_color),
-        legend=dict(font=dict(color=chart_font_color))
-    )
-    fig_strat.update_xaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    fig_strat.update_yaxes(showgrid=True, gridwidth=1, gridcolor=chart_grid_color, tickfont=dict(color=chart_font_color))
-    st.plotly_chart(fig_strat, use_container_width=True, theme=None)
+# Strategies shown separately in the breakdown by default, the rest are summed into one "Other (<n> strategies)" column
+BREAKDOWN_TOP_N = 8
+
+@perf.timed_fragment("Strategy Breakdown")
+def strategy_breakdown_chart():
+    if graph_toggle("strategy_breakdown") and selected_strategy == "Total_Account":
+        st.subheader("Equity Breakdown by Strategy")
+        # Date x strategy matrix (optionally weekly / monthly, small strategies summed as "Other"),
+        # so the figure has at most BREAKDOWN_TOP_N + 1 traces of one point per period
+        breakdown_periods = {"D": "Daily", "W": "Weekly", "ME": "Monthly"}
+        col_freq, col_top = st.columns([3, 1])
+        with col_freq:
+            breakdown_freq = st.radio("Breakdown Period", list(breakdown_periods), horizontal=True,
+                                      format_func=lambda f: breakdown_periods[f], key="breakdown_freq")
+        with col_top:
+            breakdown_top = st.number_input("Top Strategies", min_value=1, max_value=50,
+                                            value=BREAKDOWN_TOP_N, key="breakdown_top")
+        breakdown = DerivedFrames(raw_df, raw_version, memo=frame_cache(), start_date=actual_start_date,
+                                  timer=frame_timer, breakdown_freq=None if breakdown_freq == "D" else breakdown_freq,
+                                  breakdown_top=int(breakdown_top))
+        show_figure((raw_version, 'strategy_breakdown', actual_start_date, breakdown_freq, int(breakdown_top)),
+                    stacked_area_spec(y_title="Equity (USD)"), breakdown.get('strategy_breakdown'))
+
+strategy_breakdown_chart()
 
 # --- Footnote ---
 st.markdown("---")
 st.caption("* P&L is calculated as: actual balance - deposits + withdrawals. It can deviate from graphs below due to different calc method (in-trade P&L, price fluctuation of collateral)")
+
+# --- Render Timings ---
+perf.end_run()
+if timing_slot is not None:
+    perf.timing_panel(timing_slot)
@@ -0,0 +1,72 @@
+import pandas as pd
+
+# PnL attribution: splits net_pnl (total_pnl - deposit) into BTC, ETH and residual
+# contributions per strategy, using the btc_pnl / eth_pnl columns of the account tables.
+
+COMPONENTS = ['btc_pnl', 'eth_pnl', 'residual_pnl']
+
+# Accepts the resample_data rules used in app.py as well as plain period codes
+PERIODS = {
+    'D': 'D',
+    'W': 'W',
+    'M': 'M', 'ME': 'M',
+    'Q': 'Q', 'QE': 'Q',
+    'Y': 'Y', 'YE': 'Y',
+}
+
+
+def attribution_by_strategy(raw_df: pd.DataFrame, freq: str = 'D', start_date=None) -> pd.DataFrame:
+    """
+    Returns one row per (period, strategy) with net_pnl and its btc / eth / residual parts.
+    Periods are labelled by their last day, like resample_data.
+    All components are summed in a single groupby over the wide (one column per component) frame.
+    """
+    if raw_df.empty:
+        return pd.DataFrame(columns=['date_world', 'strategy', 'net_pnl'] + COMPONENTS)
+
+    if freq not in PERIODS:
+        raise ValueError(f"Unsupported attribution frequency: {freq}")
+
+    dates = pd.to_datetime(raw_df['date_world'])
+    wide = pd.DataFrame({
+        'strategy': raw_df['strategy'],
+        'net_pnl': raw_df['total_pnl'].fillna(0) - raw_df['deposit'].fillna(0),
+        'btc_pnl': raw_df['btc_pnl'].fillna(0),
+        'eth_pnl': raw_df['eth_pnl'].fillna(0),
+    })
+    wide['residual_pnl'] = wide['net_pnl'] - wide['btc_pnl'] - wide['eth_pnl']
+
+    if start_date is not None:
+        keep = dates >= pd.Timestamp(start_date)
+        wide, dates = wide[keep], dates[keep]
+
+    if PERIODS[freq] == 'D':
+        period_end = dates.dt.normalize()
+    else:
+        period_end = dates.dt.to_period(PERIODS[freq]).dt.end_time.dt.normalize()
+
+    # assign() instead of a column write, since `wide` may be a filtered slice
+    return (
+        wide.assign(date_world=period_end)
+        .groupby(['date_world', 'strategy'], sort=True)[['net_pnl'] + COMPONENTS]
+        .sum()
+        .reset_index()
+    )
+
+
+def attribution_for_view(attr_df: pd.DataFrame, strategy: str = "Total_Account") -> pd.DataFrame:
+    """
+    Reduces the per-strategy attribution to one strategy (or the account total) and
+    returns it in long form (date_world, component, pnl) for stacked bars.
+    """
+    if attr_df.empty:
+        return pd.DataFrame(columns=['date_world', 'component', 'pnl'])
+
+    if strategy != "Total_Account":
+        view = attr_df[attr_df['strategy'] == strategy]
+    else:
+        view = attr_df.groupby('date_world', sort=True)[COMPONENTS].sum().reset_index()
+
+    long_df = view.melt(id_vars='date_world', value_vars=COMPONENTS, var_name='component', value_name='pnl')
+    long_df['component'] = long_df['component'].map({'btc_pnl': 'BTC', 'eth_pnl': 'ETH', 'residual_pnl': 'Residual'})
+    return long_df
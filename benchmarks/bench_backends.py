@@ -0,0 +1,55 @@
+"""
+Compares the pandas and polars backends of data_processing at several data sizes.
+
+Usage:
+    python benchmarks/bench_backends.py [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processing import process_account_data, resample_data, calculate_monthly_heatmap_data
+from synthetic_data import generate_account_history
+
+# (years of history, number of strategies)
+SIZES = [(1, 5), (5, 50), (20, 500)]
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(repeat):
+    print(f"{'size':<16}{'step':<12}{'pandas (s)':>12}{'polars (s)':>12}{'speedup':>10}")
+    for years, n_strategies in SIZES:
+        raw = generate_account_history(n_strategies, 365 * years)
+        proc = process_account_data(raw.copy(), "Total_Account", backend="pandas")
+
+        steps = {
+            "process": lambda b: process_account_data(raw.copy(), "Total_Account", backend=b),
+            "resample_W": lambda b: resample_data(proc, "W", backend=b),
+            "resample_ME": lambda b: resample_data(proc, "ME", backend=b),
+            "resample_QE": lambda b: resample_data(proc, "QE", backend=b),
+            "heatmap": lambda b: calculate_monthly_heatmap_data(proc, "net_pnl", backend=b),
+        }
+
+        for name, step in steps.items():
+            t_pandas = best_of(lambda: step("pandas"), repeat)
+            t_polars = best_of(lambda: step("polars"), repeat)
+            label = f"{years}y x {n_strategies}"
+            print(f"{label:<16}{name:<12}{t_pandas:>12.4f}{t_polars:>12.4f}{t_pandas / t_polars:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.repeat)
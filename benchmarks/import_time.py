@@ -0,0 +1,97 @@
+"""
+Import-time benchmark for the dashboard cold start.
+
+Imports the modules app.py loads at startup in a fresh interpreter with `python -X importtime`
+and reports the cumulative import time per top-level package, the total, and whether heavy
+optional modules (ccxt, polars) were pulled in. Exits with 1 if the total exceeds --budget-ms
+or a module listed in FORBIDDEN was imported.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5] [--top 15] [--budget-ms 3000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported at the top of app.py (the dashboard itself is a script and is not importable)
+APP_MODULES = [
+    "streamlit", "pandas", "plotly.graph_objects",
+    "config", "db_utils", "data_processing", "dashboard_data", "snapshots", "online_stats", "price_history",
+    "projection", "attribution", "charts", "perf", "overview", "cache_warmer", "exports", "data_loading",
+]
+
+# Must only be imported when a loader runs / the backend is selected
+FORBIDDEN = ["ccxt", "bitget", "hl", "polars"]
+
+
+def measure(modules):
+    """
+    Imports `modules` in a fresh interpreter. Returns ({top-level package: cumulative us}, imported forbidden modules).
+    """
+    code = (
+        "import sys\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + f"print(','.join(m for m in {FORBIDDEN!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below their importer, top-level entries are not
+        name = name[1:]
+        if name == name.lstrip() and cum.strip().isdigit():
+            cumulative[name] = cumulative.get(name, 0) + int(cum)
+
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative, loaded
+
+
+def run(args):
+    runs = [measure(APP_MODULES) for _ in range(args.repeat)]
+    loaded = runs[-1][1]
+
+    packages = {}
+    for cumulative, _ in runs:
+        for name, us in cumulative.items():
+            packages.setdefault(name, []).append(us)
+    totals = [sum(cumulative.values()) for cumulative, _ in runs]
+
+    print(f"{'module':<32}{'median (ms)':>12}")
+    ranked = sorted(packages.items(), key=lambda kv: statistics.median(kv[1]), reverse=True)
+    for name, timings in ranked[:args.top]:
+        print(f"{name:<32}{statistics.median(timings) / 1000:>12.1f}")
+    total_ms = statistics.median(totals) / 1000
+    print(f"{'total':<32}{total_ms:>12.1f}")
+    print(f"Heavy modules imported: {', '.join(loaded) if loaded else 'none'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "total_ms": total_ms,
+                "modules": {name: statistics.median(t) / 1000 for name, t in packages.items()},
+                "forbidden_loaded": loaded,
+            }, f, indent=2)
+
+    failed = bool(loaded)
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"Import time {total_ms:.0f} ms exceeds the budget of {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreter runs (median is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the total import time exceeds this")
+    parser.add_argument("--output", help="Optional JSON output path")
+    sys.exit(run(parser.parse_args()))
@@ -0,0 +1,180 @@
+"""
+Benchmark suite for data_processing and the dashboard data path.
+
+Times process_account_data, resample_data (W / ME / QE), calculate_monthly_heatmap_data
+and the full app.py data path (dashboard_data frames, up to figure construction) on synthetic
+account histories of 1, 5 and 20 years x 5, 50 and 500 strategies, for several users.
+Results are written as JSON so runs can be compared between commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--users 3] [--repeat 3] [--quick] [--output results.json]
+    python benchmarks/run_benchmarks.py --compare old.json new.json [--threshold 0.10]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config
+from dashboard_data import DerivedFrames
+from data_processing import process_account_data, resample_data, calculate_monthly_heatmap_data, data_version
+from synthetic_data import generate_account_history
+
+YEARS = [1, 5, 20]
+STRATEGIES = [5, 50, 500]
+QUICK_YEARS = [1, 5]
+QUICK_STRATEGIES = [5, 50]
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def app_data_path(raw_df, strategy="Total_Account", start_date=date(2023, 1, 1), pnl_col="net_pnl"):
+    """
+    Mirrors the data steps of app.py for an admin with every chart enabled (cold memo),
+    stopping right before the plotly figures are built.
+    """
+    frames = DerivedFrames(raw_df, data_version(raw_df), strategy=strategy,
+                           start_date=start_date, pnl_col=pnl_col)
+    return [frames.get(name) for name in
+            ['proc', 'weekly', 'monthly', 'quarterly', 'heatmap', 'strategy_breakdown']]
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def run_case(years, n_strategies, n_users, repeat):
+    """
+    Runs every step for one data size; timings are pooled over all users.
+    """
+    steps = {}
+    rows = 0
+    for user_idx in range(n_users):
+        raw = generate_account_history(n_strategies, 365 * years, user_idx=user_idx)
+        rows = len(raw)
+
+        # process_account_data converts date_world in place, so time it on fresh copies
+        steps.setdefault("process_account_data", []).extend(
+            time_call(lambda: process_account_data(raw.copy(), "Total_Account"), repeat))
+
+        proc = process_account_data(raw, "Total_Account")
+        for freq in ["W", "ME", "QE"]:
+            steps.setdefault(f"resample_data[{freq}]", []).extend(
+                time_call(lambda: resample_data(proc, freq), repeat))
+
+        steps.setdefault("calculate_monthly_heatmap_data", []).extend(
+            time_call(lambda: calculate_monthly_heatmap_data(proc, pnl_col="net_pnl"), repeat))
+
+        fresh = generate_account_history(n_strategies, 365 * years, user_idx=user_idx)
+        steps.setdefault("app_data_path", []).extend(
+            time_call(lambda: app_data_path(fresh.copy()), repeat))
+
+    results = []
+    for step, timings in steps.items():
+        results.append({
+            "case": f"{years}y_{n_strategies}s",
+            "years": years,
+            "strategies": n_strategies,
+            "users": n_users,
+            "rows_per_user": rows,
+            "step": step,
+            "min": min(timings),
+            "mean": statistics.mean(timings),
+            "max": max(timings),
+            "rounds": len(timings),
+        })
+    return results
+
+
+def run(args):
+    years = QUICK_YEARS if args.quick else YEARS
+    strategies = QUICK_STRATEGIES if args.quick else STRATEGIES
+
+    results = []
+    for y in years:
+        for s in strategies:
+            print(f"Running {y}y x {s} strategies x {args.users} users...", flush=True)
+            for r in run_case(y, s, args.users, args.repeat):
+                print(f"  {r['step']:<32}{r['min']:>10.4f}s (mean {r['mean']:.4f}s)")
+                results.append(r)
+
+    commit = git_commit()
+    payload = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "backend": config.get_data_backend(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{commit}.json")
+    with open(output, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {output}")
+
+
+def compare(old_path, new_path, threshold):
+    """
+    Prints min-time ratios new/old per (case, step) and returns 1 if any step
+    regressed by more than the threshold.
+    """
+    with open(old_path) as f:
+        old = {(r["case"], r["step"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {(r["case"], r["step"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'case':<12}{'step':<34}{'old (s)':>10}{'new (s)':>10}{'ratio':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key]["min"] / old[key]["min"] if old[key]["min"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key[0]:<12}{key[1]:<34}{old[key]['min']:>10.4f}{new[key]['min']:>10.4f}{ratio:>7.2f}x{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=3, help="Number of synthetic users per size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed rounds per step and user")
+    parser.add_argument("--quick", action="store_true", help="Skip the 20 year and 500 strategy sizes")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown for --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold))
+    run(args)
@@ -0,0 +1,64 @@
+import logging
+import threading
+import time
+
+# Background warm-up of the dashboard caches.
+# The caches live in the Streamlit server process, so they are warmed by a daemon thread in
+# that process (started once per server by app.py, for the users in CACHE_WARM_USERS), not by
+# a separate script. The thread warms each user right away, again whenever the user's stamp
+# changes (a cheap query that changes after each load / new snapshot) and before the cached
+# data expires, so the first real session of the day finds the fetch, processing and rollup
+# caches filled.
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer(threading.Thread):
+    '''
+    Daemon thread calling warm(user) for each user on start, when stamp(user) changes and
+    when the last warm-up of the user is older than `refresh` seconds (set it below the cache
+    TTL). Checks every `poll` seconds. Before a re-warm invalidate(user) is called: stale data
+    must be dropped, and a cache hit would not renew an entry that is about to expire.
+    '''
+
+    def __init__(self, users, warm, stamp=None, invalidate=None, poll: float = 60, refresh: float = 300):
+        super().__init__(name="cache-warmer", daemon=True)
+        self.users = list(users)
+        self.warm = warm
+        self.stamp = stamp
+        self.invalidate = invalidate
+        self.poll = poll
+        self.refresh = refresh
+        self.stamps = {}
+        self.warmed_at = {}
+        self.durations = {}
+        self._stop_event = threading.Event()
+
+    def run_once(self):
+        """
+        One pass over all users (also usable without starting the thread).
+        """
+        for user in self.users:
+            try:
+                stamp = self.stamp(user) if self.stamp is not None else None
+                changed = user in self.stamps and stamp != self.stamps[user]
+                expired = time.time() - self.warmed_at.get(user, 0) > self.refresh
+                if changed or expired:
+                    if (changed or user in self.warmed_at) and self.invalidate is not None:
+                        self.invalidate(user)
+                    start = time.perf_counter()
+                    self.warm(user)
+                    self.durations[user] = time.perf_counter() - start
+                    self.warmed_at[user] = time.time()
+                    logger.info(f"Warmed caches for {user} in {self.durations[user]:.2f}s")
+                self.stamps[user] = stamp
+            except Exception as e:
+                logger.error(f"Error warming caches for {user}: {e}")
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.poll)
+
+    def stop(self):
+        self._stop_event.set()
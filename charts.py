@@ -0,0 +1,336 @@
+import json
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from downsample import downsample, aggregate_bars, lttb_indices
+
+# Chart factory for the dashboard.
+# Figures are described by small declarative specs (plain dicts) and built with plotly express.
+# Building validates every property through plotly, so the app caches the serialized figure JSON
+# per (dataset version, spec) and turns cached JSON back into a figure with figure_from_json(),
+# which skips the validators. Figures carry no colors of their own: the dark / light look is a
+# plotly template that figure_from_json() swaps in, so a theme change never rebuilds a figure.
+
+# Payload bounds: bar series longer than MAX_BARS are aggregated into buckets, line / area
+# series are downsampled to MAX_POINTS and drawn with WebGL above WEBGL_THRESHOLD points.
+MAX_BARS = 1000
+MAX_POINTS = 2000
+WEBGL_THRESHOLD = 1000
+
+THEMES = {
+    'dark': {'font': "#ffffff", 'grid': "LightGray", 'bg': "rgba(0,0,0,0)"},
+    'light': {'font': "#333333", 'grid': "#e5e5e5", 'bg': "#ffffff"},
+}
+
+
+def _template(colors: dict) -> go.layout.Template:
+    # Plotly's default template with the dashboard's background, text and grid colors
+    template = go.layout.Template(pio.templates['plotly'])
+    template.layout.update(
+        paper_bgcolor=colors['bg'],
+        plot_bgcolor=colors['bg'],
+        font=dict(color=colors['font']),
+        title_font_color=colors['font'],
+        legend_font_color=colors['font'],
+        coloraxis_colorbar_tickfont_color=colors['font'],
+    )
+    axis = dict(showgrid=True, gridwidth=1, gridcolor=colors['grid'], tickfont=dict(color=colors['font']))
+    template.layout.xaxis.update(axis)
+    template.layout.yaxis.update(axis)
+    template.layout.annotationdefaults.update(font=dict(color=colors['font']))
+    return template
+
+
+TEMPLATES = {name: _template(colors) for name, colors in THEMES.items()}
+_TEMPLATE_DICTS = {name: template.to_plotly_json() for name, template in TEMPLATES.items()}
+
+
+def pnl_bar_spec(x: str, y: str, title: str, x_label: str = "Date", y_label: str = "PnL",
+                 height: int = 250, agg: str = 'sum') -> dict:
+    """
+    Spec of a PnL bar chart colored red (loss) to green (profit), e.g. Daily PnL or Cumulative Monthly PnL.
+    `agg` says how bars are combined when the series is too long: 'sum' for per-period PnL,
+    'last' for cumulative series.
+    """
+    return {
+        'kind': 'pnl_bar',
+        'x': x,
+        'y': y,
+        'title': title,
+        'x_label': x_label,
+        'y_label': y_label,
+        'height': height,
+        'agg': agg,
+    }
+
+
+def _pnl_bar(df: pd.DataFrame, spec: dict) -> go.Figure:
+    bars, bucket = aggregate_bars(df, spec['x'], spec['y'], MAX_BARS, spec.get('agg', 'sum'))
+    title = spec['title'] if bucket == 1 else f"{spec['title']} ({bucket}-period buckets)"
+    fig = px.bar(bars, x=spec['x'], y=spec['y'],
+                 color=spec['y'],
+                 color_continuous_scale=['red', 'green'],
+                 color_continuous_midpoint=0,
+                 title=title)
+    fig.update_layout(
+        height=spec['height'],
+        margin=dict(l=20, r=20, t=30, b=20),
+        xaxis_title=None,
+        yaxis_title=None,
+        coloraxis_showscale=False
+    )
+    fig.update_traces(hovertemplate=f"{spec['x_label']}: %{{x}}<br>{spec['y_label']}: $%{{y:,.2f}}<extra></extra>")
+    return fig
+
+
+def subplot_spec(panels: list) -> dict:
+    """
+    Spec of one figure with the given panel specs stacked on a shared x-axis
+    (e.g. PnL and cumulative PnL of the same period). Panels must use the same frame and x.
+    """
+    return {'kind': 'subplots', 'panels': panels}
+
+
+def _pnl_bar_trace(df: pd.DataFrame, spec: dict):
+    bars, _ = aggregate_bars(df, spec['x'], spec['y'], MAX_BARS, spec.get('agg', 'sum'))
+    x = bars[spec['x']]
+    if pd.api.types.is_datetime64_any_dtype(x):
+        # Epoch milliseconds travel as a compact typed array instead of ISO date strings
+        x = x.astype('datetime64[ms]').astype('int64')
+    y = bars[spec['y']]
+    return go.Bar(x=x, y=y, name=spec['title'], showlegend=False,
+                  marker=dict(color=y, colorscale=[[0, 'red'], [1, 'green']], cmid=0, showscale=False),
+                  hovertemplate=f"{spec['x_label']}: %{{x}}<br>{spec['y_label']}: $%{{y:,.2f}}<extra></extra>")
+
+
+def _subplots(df: pd.DataFrame, spec: dict) -> go.Figure:
+    panels = spec['panels']
+    for panel in panels:
+        if panel['kind'] != 'pnl_bar':
+            raise ValueError(f"Unsupported subplot panel: {panel['kind']}")
+
+    fig = make_subplots(rows=len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.12,
+                        subplot_titles=[p['title'] for p in panels])
+    for row, panel in enumerate(panels, start=1):
+        fig.add_trace(_pnl_bar_trace(df, panel), row=row, col=1)
+
+    fig.update_layout(
+        height=sum(p['height'] for p in panels),
+        margin=dict(l=20, r=20, t=30, b=20),
+        bargap=0.1
+    )
+    fig.update_annotations(x=0, xanchor='left')
+    if pd.api.types.is_datetime64_any_dtype(df[panels[0]['x']]):
+        fig.update_xaxes(type='date', hoverformat='%Y-%m-%d')
+    return fig
+
+
+def stacked_bar_spec(x: str, y: str, color: str, title: str, color_map: dict = None,
+                     x_label: str = "Period", height: int = 300) -> dict:
+    """
+    Spec of a bar chart stacked by `color` (negative parts below zero), e.g. the PnL attribution.
+    """
+    return {'kind': 'stacked_bar', 'x': x, 'y': y, 'color': color, 'title': title,
+            'color_map': color_map, 'x_label': x_label, 'height': height}
+
+
+def _stacked_bar(df: pd.DataFrame, spec: dict) -> go.Figure:
+    fig = px.bar(df, x=spec['x'], y=spec['y'], color=spec['color'],
+                 color_discrete_map=spec['color_map'] or {},
+                 title=spec['title'])
+    fig.update_layout(
+        height=spec['height'],
+        barmode='relative',
+        margin=dict(l=20, r=20, t=30, b=20),
+        xaxis_title=None,
+        yaxis_title=None,
+        legend=dict(y=1.1, x=0, orientation='h', title=None)
+    )
+    fig.update_traces(hovertemplate=f"{spec['x_label']}: %{{x}}<br>%{{fullData.name}}: $%{{y:,.2f}}<extra></extra>")
+    return fig
+
+
+def stacked_area_spec(y_title: str = None, height: int = 400) -> dict:
+    """
+    Spec of an area chart stacked over the columns of a date x series matrix, e.g. equity by
+    strategy (see pivot_strategy_equity). One trace per column, so bucket long tails first.
+    """
+    return {'kind': 'stacked_area', 'y_title': y_title, 'height': height}
+
+
+def _stacked_area(matrix: pd.DataFrame, spec: dict) -> go.Figure:
+    # All series share the x values, so rows are downsampled once (LTTB on the stacked total)
+    if len(matrix) > MAX_POINTS:
+        matrix = matrix.iloc[lttb_indices(matrix.index.to_numpy(), matrix.sum(axis=1).to_numpy(), MAX_POINTS)]
+    x = matrix.index
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x = x.to_numpy().astype('datetime64[ms]').astype('int64')
+
+    fig = go.Figure()
+    for column in matrix.columns:
+        fig.add_trace(go.Scatter(x=x, y=matrix[column].to_numpy(), name=str(column), mode='lines',
+                                 stackgroup='one', line=dict(width=0.5),
+                                 hovertemplate=f"Date: %{{x|%Y-%m-%d}}<br>{column}: $%{{y:,.2f}}<extra></extra>"))
+    fig.update_layout(
+        height=spec['height'],
+        title="",
+        xaxis_title=None,
+        yaxis_title=spec['y_title'],
+        legend=dict(title=None)
+    )
+    if pd.api.types.is_datetime64_any_dtype(matrix.index):
+        fig.update_xaxes(type='date')
+    return fig
+
+
+def heatmap_spec(height: int = 400) -> dict:
+    """
+    Spec of the monthly returns heatmap; the data is the (pnl, pct) pair of
+    calculate_monthly_heatmap_data. Colors show the return, hover adds the absolute PnL.
+    """
+    return {'kind': 'heatmap', 'height': height}
+
+
+def _heatmap(data, spec: dict) -> go.Figure:
+    heatmap_pnl, heatmap_pct = data
+    fig = px.imshow(heatmap_pct,
+                    labels=dict(x="Month", y="Year", color="Return (%)"),
+                    x=heatmap_pct.columns,
+                    y=heatmap_pct.index,
+                    color_continuous_scale=['red', 'white', 'green'],
+                    color_continuous_midpoint=0,
+                    aspect="auto",
+                    text_auto=".2f",
+                    title="")
+    # Plotly imshow matches values by index/col, so the PnL frame is passed as custom data
+    fig.update_traces(
+        customdata=heatmap_pnl.values,
+        hovertemplate="Year: %{y}<br>Month: %{x}<br>Return: %{z:.2f}%<br>PnL: $%{customdata:,.2f}<extra></extra>"
+    )
+    fig.update_layout(height=spec['height'], title="")
+    # The heatmap has no grid
+    fig.update_xaxes(showgrid=False)
+    fig.update_yaxes(showgrid=False)
+    return fig
+
+
+def balance_spec(title: str = "Total Balance", height: int = 300) -> dict:
+    """
+    Spec of the equity curve; the data is the (processed, benchmark equity, projection bands)
+    triple, where the last two may be empty frames (see price_history / projection).
+    """
+    return {'kind': 'balance', 'title': title, 'height': height}
+
+
+def _balance(data, spec: dict) -> go.Figure:
+    proc_df, bench_df, bands_df = data
+    # Long histories are downsampled (LTTB) and drawn with WebGL, see line_trace
+    fig = go.Figure(line_trace(proc_df, 'date_world', 'equity', fill='tozeroy', line=dict(color='#3498db'),
+                               name="Balance", showlegend=False,
+                               hovertemplate="Date: %{x}<br>Balance: $%{y:,.2f}<extra></extra>"))
+    for asset in bench_df.columns:
+        asset_df = pd.DataFrame({'date_world': proc_df['date_world'].to_numpy(), asset: bench_df[asset].to_numpy()})
+        fig.add_trace(line_trace(asset_df, 'date_world', asset,
+                                 name=f"{asset} Buy & Hold", line=dict(width=1, dash='dot'),
+                                 hovertemplate=f"Date: %{{x}}<br>{asset} Buy & Hold: $%{{y:,.2f}}<extra></extra>"))
+    if not bands_df.empty:
+        band_color = "rgba(52,152,219,0.15)"
+        for lower, upper, label in [('p5', 'p95', '5-95%'), ('p25', 'p75', '25-75%')]:
+            fig.add_trace(go.Scatter(x=bands_df['date_world'], y=bands_df[upper], mode='lines',
+                                     line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=bands_df['date_world'], y=bands_df[lower], mode='lines',
+                                     line=dict(width=0), fill='tonexty', fillcolor=band_color,
+                                     name=f"Projection {label}", hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=bands_df['date_world'], y=bands_df['p50'], mode='lines',
+                                 name="Projection Median", line=dict(color='#3498db', dash='dash'),
+                                 hovertemplate="Date: %{x}<br>Median: $%{y:,.2f}<extra></extra>"))
+    fig.update_layout(
+        title=spec['title'],
+        height=spec['height'],
+        margin=dict(l=20, r=20, t=30, b=20),
+        xaxis_title=None,
+        yaxis_title=None,
+        legend=dict(y=1.1, x=0, orientation='h')
+    )
+    return fig
+
+
+BUILDERS = {
+    'balance': _balance,
+    'pnl_bar': _pnl_bar,
+    'subplots': _subplots,
+    'stacked_bar': _stacked_bar,
+    'stacked_area': _stacked_area,
+    'heatmap': _heatmap,
+}
+
+
+def line_trace(df: pd.DataFrame, x: str, y: str, max_points: int = MAX_POINTS, method: str = 'lttb', **kwargs):
+    """
+    Line / area trace of y over x, downsampled to max_points and rendered with WebGL
+    (Scattergl) above WEBGL_THRESHOLD points. Extra keyword arguments go to the trace.
+    """
+    data = downsample(df, x, y, max_points, method)
+    trace_type = go.Scattergl if len(data) > WEBGL_THRESHOLD else go.Scatter
+    return trace_type(x=data[x], y=data[y], mode='lines', **kwargs)
+
+
+def build_figure(df: pd.DataFrame, spec: dict, theme: str = None) -> go.Figure:
+    """
+    Builds the figure described by `spec`, styled with the 'dark' / 'light' template if given.
+    """
+    if spec['kind'] not in BUILDERS:
+        raise ValueError(f"Unknown chart kind: {spec['kind']}")
+    fig = BUILDERS[spec['kind']](df, spec)
+    if theme is not None:
+        apply_theme(fig, theme)
+    return fig
+
+
+def apply_theme(fig: go.Figure, theme: str) -> go.Figure:
+    """
+    Styles a figure built outside the factory.
+    """
+    fig.update_layout(template=TEMPLATES[theme])
+    return fig
+
+
+def figure_json(df, spec: dict) -> str:
+    """
+    Builds the figure and returns it serialized (plotly JSON) without a template, ready for caching.
+    """
+    fig_dict = build_figure(df, spec).to_plotly_json()
+    fig_dict['layout'].pop('template', None)
+    return pio.to_json(fig_dict, validate=False)
+
+
+class PrebuiltFigure(go.Figure):
+    '''
+    Figure wrapping an already validated figure dict.
+    st.plotly_chart serializes a Figure via to_dict() without validating it again,
+    so the dict is handed over as is instead of being rebuilt property by property.
+    '''
+
+    def __init__(self, fig_dict: dict):
+        super().__init__()
+        self._fig_dict = fig_dict
+
+    def to_dict(self):
+        return self._fig_dict
+
+    def to_plotly_json(self):
+        return self._fig_dict
+
+
+def figure_from_json(fig_json: str, theme: str = 'dark') -> go.Figure:
+    """
+    Turns cached figure JSON into a figure for st.plotly_chart without plotly validation,
+    styled by swapping in the theme's template.
+    """
+    fig_dict = json.loads(fig_json)
+    fig_dict.setdefault('layout', {})['template'] = _TEMPLATE_DICTS[theme]
+    return PrebuiltFigure(fig_dict)
@@ -1,10 +1,50 @@
+import logging
 import os
-import streamlit as st
 from dotenv import load_dotenv
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Legacy Streamlit secrets files, read directly so the core modules don't need Streamlit.
+# Like st.secrets, the project file overrides the global one.
+SECRETS_PATHS = [
+    os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"),
+    os.path.join(os.getcwd(), ".streamlit", "secrets.toml"),
+]
+
+_secrets = None
+
+def get_secrets():
+    """
+    Returns the legacy secrets (.streamlit/secrets.toml) as a dict, empty if there are none.
+    Loaded once per process.
+    """
+    global _secrets
+    if _secrets is None:
+        _secrets = {}
+        for path in SECRETS_PATHS:
+            if not os.path.exists(path):
+                continue
+            if tomllib is None:
+                logger.error(f"Cannot read {path}: install tomli (Python < 3.11)")
+                continue
+            try:
+                with open(path, "rb") as f:
+                    _secrets.update(tomllib.load(f))
+            except (OSError, tomllib.TOMLDecodeError) as e:
+                logger.error(f"Cannot read {path}: {e}")
+    return _secrets
+
 def get_env_var(key, default=None, user=None):
     """
     Retrieve environment variable with optional User prefix.
@@ -38,7 +78,7 @@ def get_db_creds(user_key):
     """
     Retrieve database credentials for a specific user.
     Prioritizes Environment Variables.
-    Falls back to st.secrets for backward compatibility (optional).
+    Falls back to the legacy secrets file for backward compatibility (optional).
     """
     # 1. Try Environment Variables
     # keys needed: host, dbname, user, password, port
@@ -69,9 +109,10 @@ def get_db_creds(user_key):
             "port": port
         }
 
-    # 2. Fallback to st.secrets
-    if user_key in st.secrets:
-        return st.secrets[user_key]
+    # 2. Fallback to secrets.toml
+    secrets = get_secrets()
+    if user_key in secrets:
+        return secrets[user_key]
         
     return {}
 
@@ -85,8 +126,9 @@ def get_valid_users():
         return [u.strip() for u in users_str.split(",")]
     
     # Fallback to secrets
-    if "database" in st.secrets and "users" in st.secrets["database"]:
-        return st.secrets["database"]["users"]
+    secrets = get_secrets()
+    if "database" in secrets and "users" in secrets["database"]:
+        return secrets["database"]["users"]
         
     # Default fallback
     return ["user1", "user2"]
@@ -100,8 +142,9 @@ def get_table_name(user_key):
     if tbl:
         return tbl
         
-    if user_key in st.secrets:
-         return st.secrets[user_key].get("table_name", user_key)
+    secrets = get_secrets()
+    if user_key in secrets:
+         return secrets[user_key].get("table_name", user_key)
          
     return user_key
 
@@ -111,3 +154,82 @@ def get_dashboard_users_key():
     """
     # Usually "user1" or defined in env
     return os.getenv("DASHBOARD_DB_USER", "user1")
+
+def get_data_backend():
+    """
+    Returns the execution backend for data_processing ('pandas' or 'polars').
+    Env Var: DATA_BACKEND
+    """
+    return os.getenv("DATA_BACKEND", "pandas")
+
+def get_frame_cache_mb():
+    """
+    Returns the memory budget (MB) of the server-wide LRU cache of derived dashboard frames.
+    Env Var: FRAME_CACHE_MB
+    """
+    return int(os.getenv("FRAME_CACHE_MB", "256"))
+
+def get_combined_charts():
+    """
+    Returns True if each PnL / cumulative PnL pair is drawn as one figure with a shared x-axis.
+    Env Var: COMBINED_CHARTS (true/false)
+    """
+    return os.getenv("COMBINED_CHARTS", "true").lower() in ("1", "true", "yes")
+
+def get_progressive_rendering():
+    """
+    Returns True if the dashboard shows the header and KPIs from a small summary query
+    before the full history is loaded.
+    Env Var: PROGRESSIVE_RENDERING (true/false)
+    """
+    return os.getenv("PROGRESSIVE_RENDERING", "true").lower() in ("1", "true", "yes")
+
+def get_use_snapshots():
+    """
+    Returns True if the dashboard reads the precomputed snapshots (when they match the loaded data).
+    Env Var: USE_SNAPSHOTS (true/false)
+    """
+    return os.getenv("USE_SNAPSHOTS", "true").lower() in ("1", "true", "yes")
+
+def get_cache_warm_users():
+    """
+    Returns the users whose dashboard caches are kept warm by a background thread
+    (default: none; 'all' for all valid users). Unknown users are ignored.
+    Env Var: CACHE_WARM_USERS (comma-separated)
+    """
+    users_str = os.getenv("CACHE_WARM_USERS", "").strip()
+    if users_str.lower() in ("", "none"):
+        return []
+    valid_users = get_valid_users()
+    if users_str.lower() == "all":
+        return valid_users
+    return [u.strip() for u in users_str.split(",") if u.strip() in valid_users]
+
+def get_cache_warm_interval():
+    """
+    Returns how often (seconds) the cache warm-up thread checks for new snapshots / expired data.
+    Env Var: CACHE_WARM_INTERVAL
+    """
+    return float(os.getenv("CACHE_WARM_INTERVAL", "60"))
+
+def get_perf_history_runs():
+    """
+    Returns how many reruns the admin timing panel keeps for rolling averages and the export.
+    Env Var: PERF_HISTORY_RUNS
+    """
+    return int(os.getenv("PERF_HISTORY_RUNS", "20"))
+
+def get_export_dir():
+    """
+    Returns the directory of the cached data exports (CSV / Parquet downloads).
+    Env Var: EXPORT_DIR
+    """
+    return os.getenv("EXPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "exports"))
+
+def get_api_token():
+    """
+    Returns the bearer token required by the read-only HTTP API (api_server.py); empty = no auth,
+    which api_server.py only allows on a loopback address.
+    Env Var: API_TOKEN
+    """
+    return os.getenv("API_TOKEN", "")
@@ -1,10 +1,13 @@
-import streamlit as st
+import logging
 import config
 from db_utils import fetch_data
-from data_loading import run_data_loading
+from data_loading import run_data_loading, run_price_update
+from snapshots import write_snapshot
 import sys
 
 def main():
+    # The core modules report errors through logging
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     print("Starting daily update...")
 
     # Configuration: Define users and their target exchanges
@@ -25,10 +28,10 @@ def main():
     
     any_failure = False
 
-    for config in user_configs:
-        user = config["user"]
-        user_id_val = config["user_id_val"]
-        exchanges = config["exchanges"]
+    for user_config in user_configs:
+        user = user_config["user"]
+        user_id_val = user_config["user_id_val"]
+        exchanges = user_config["exchanges"]
         
         print(f"\n=== Processing {user} ===")
         
@@ -63,6 +66,22 @@ def main():
                 print(f"CRITICAL ERROR for {ex} ({user}): {e}")
                 any_failure = True
 
+    # 3. Benchmark prices (shared by all users, stored in the dashboard database)
+    print("\n=== Updating price history ===")
+    success, msg = run_price_update(user_configs[0]["user"])
+    # Benchmarks are optional, so a failure here does not fail the job
+    print(f"{'SUCCESS' if success else 'WARNING'}: {msg}")
+
+    # 4. Dashboard snapshots: rollups, heatmaps and KPIs of the freshly loaded history,
+    #    stored in the database next to each account table for the dashboard to read
+    print("\n=== Writing dashboard snapshots ===")
+    for user_config in user_configs:
+        user = user_config["user"]
+        table_name = config.get_table_name(user)
+        success, msg = write_snapshot(user, table_name, fetch_data(user, table_name=table_name))
+        # The dashboard computes everything live without a snapshot, so this does not fail the job
+        print(f"{'SUCCESS' if success else 'WARNING'}: {msg}")
+
     print("--- Daily Update Complete ---")
     
     if any_failure:
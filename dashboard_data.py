@@ -0,0 +1,215 @@
+import contextlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from data_processing import (process_account_data, resample_data, calculate_monthly_heatmap_data,
+                             pivot_strategy_equity)
+
+# Lazy dependency graph of the frames derived from a user's raw data.
+# Each named frame is computed on first access, together with whatever it depends on,
+# and memoized under (data version, frame name, settings it depends on), so charts that are
+# switched off cost nothing and shared intermediates (e.g. 'proc' for all rollups) are computed once.
+#
+#   raw -> processed -> proc -> weekly / monthly / quarterly / heatmap
+#   raw -> strategy_breakdown
+#
+# With a snapshot (see snapshots.py) 'processed' and the full-history rollups are read from
+# the stored frames instead; only days added after the snapshot are computed.
+
+NODES = {}
+
+
+def node(name, deps=(), params=()):
+    """
+    Registers a derived frame. `deps` are other frames passed as arguments, `params` the
+    view settings (attributes of DerivedFrames) the result depends on.
+    """
+    def register(func):
+        all_params = set(params)
+        for dep in deps:
+            all_params |= NODES[dep]['params']
+        NODES[name] = {'func': func, 'deps': deps, 'params': frozenset(all_params)}
+        return func
+    return register
+
+
+@node('processed', params=('strategy',))
+def _processed(ctx):
+    if ctx.snapshot is not None and ctx.snapshot.has(ctx.strategy):
+        return ctx.snapshot.processed(ctx.strategy)
+    return process_account_data(ctx.raw_df, ctx.strategy)
+
+
+@node('proc', deps=('processed',), params=('start_date', 'pnl_col'))
+def _proc(ctx, processed):
+    # Filter by start date and restart the cumulative PnL there, so charts start at 0
+    proc_df = processed[processed['date_world'] >= pd.Timestamp(ctx.start_date)].copy()
+    proc_df['cum_pnl'] = proc_df[ctx.pnl_col].cumsum()
+    return proc_df
+
+
+def _stored(ctx, name, proc):
+    # Snapshot frames hold the full-history view, so they are only used if the start date
+    # filters nothing and no days were added since the snapshot
+    snapshot = ctx.snapshot
+    if (snapshot is None or not snapshot.current or not snapshot.has(ctx.strategy)
+            or ctx.pnl_col != snapshot.pnl_col or len(proc) != len(ctx.get('processed'))):
+        return None
+    return snapshot.frame(ctx.strategy, name)
+
+
+@node('weekly', deps=('proc',))
+def _weekly(ctx, proc):
+    stored = _stored(ctx, 'weekly', proc)
+    if stored is not None:
+        return stored
+    return resample_data(proc, 'W')
+
+
+@node('monthly', deps=('proc',))
+def _monthly(ctx, proc):
+    stored = _stored(ctx, 'monthly', proc)
+    if stored is not None:
+        return stored
+    monthly_df = resample_data(proc, 'ME')
+    # Month name/year for better readability
+    monthly_df['Month'] = monthly_df['date_world'].dt.strftime('%b %Y')
+    return monthly_df
+
+
+@node('quarterly', deps=('proc',))
+def _quarterly(ctx, proc):
+    stored = _stored(ctx, 'quarterly', proc)
+    if stored is not None:
+        return stored
+    quarterly_df = resample_data(proc, 'QE')
+    # Format quarter nicely (e.g., 2023Q1)
+    quarterly_df['Quarter'] = quarterly_df['date_world'].dt.to_period('Q').astype(str)
+    return quarterly_df
+
+
+@node('heatmap', deps=('proc',))
+def _heatmap(ctx, proc):
+    stored = _stored(ctx, 'heatmap', proc)
+    if stored is not None:
+        return stored
+    return calculate_monthly_heatmap_data(proc, pnl_col=ctx.pnl_col)
+
+
+@node('strategy_breakdown', params=('start_date', 'breakdown_freq', 'breakdown_top'))
+def _strategy_breakdown(ctx):
+    # Date x strategy equity matrix, built from the raw rows (independent of 'processed')
+    return pivot_strategy_equity(ctx.raw_df, ctx.start_date, ctx.breakdown_freq, ctx.breakdown_top)
+
+
+def _nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        # deep=True counts the strings held by object columns (e.g. strategy), not just the pointers
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class FrameCache():
+    '''
+    Thread-safe LRU memo for derived frames, bounded by the memory of the stored frames.
+    Can be passed as `memo` to DerivedFrames and shared by all sessions of a server;
+    cached frames must therefore be treated as read-only.
+    '''
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key):
+        with self._lock:
+            value, _ = self._entries[key]
+            self._entries.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+class DerivedFrames():
+    '''
+    View of the derived frames for one (raw data version, strategy, start date).
+
+    The memo (a dict or a FrameCache) is keyed by (data version, frame name, relevant
+    settings), so it can be shared by all views and users: changing the start date
+    re-uses 'processed', going back to an earlier setting re-uses everything.
+    A snapshot (snapshots.Snapshot) checked against raw_df only changes how frames are
+    computed, not their values, so it is not part of the keys.
+    `timer(name)`, if given, returns a context manager around each frame computation.
+    breakdown_freq / breakdown_top set the resampling and top-N of the strategy breakdown.
+    '''
+
+    def __init__(self, raw_df: pd.DataFrame, version: str, memo: dict = None,
+                 strategy: str = "Total_Account", start_date=None, pnl_col: str = 'net_pnl', snapshot=None, timer=None,
+                 breakdown_freq: str = None, breakdown_top: int = None):
+        self.raw_df = raw_df
+        self.version = version
+        self.memo = memo if memo is not None else {}
+        self.strategy = strategy
+        self.start_date = start_date if start_date is not None else pd.Timestamp.min
+        self.pnl_col = pnl_col
+        self.snapshot = snapshot
+        self.timer = timer
+        self.breakdown_freq = breakdown_freq
+        self.breakdown_top = breakdown_top
+
+    def _key(self, name):
+        params = NODES[name]['params']
+        return (self.version, name) + tuple((p, getattr(self, p)) for p in sorted(params))
+
+    def get(self, name):
+        """
+        Returns the named frame, computing it (and its dependencies) on first use.
+        """
+        if name not in NODES:
+            raise KeyError(f"Unknown derived frame: {name}")
+
+        key = self._key(name)
+        try:
+            return self.memo[key]
+        except KeyError:
+            pass
+        spec = NODES[name]
+        inputs = [self.get(dep) for dep in spec['deps']]
+        with self.timer(name) if self.timer is not None else contextlib.nullcontext():
+            value = spec['func'](self, *inputs)
+        self.memo[key] = value
+        return value
+
+    def computed(self):
+        """
+        Names of the frames computed so far for this view (for diagnostics).
+        """
+        return [name for name in NODES if self._key(name) in self.memo]
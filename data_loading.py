@@ -1,11 +1,51 @@
-import streamlit as st
+import logging
 from datetime import datetime
 import pandas as pd
-from bitget import trade_bitget
-from hl import trade_hl
-from db_utils import insert_account_data
+from db_utils import insert_account_data, get_online_stats, save_online_stats
+from online_stats import OnlineStats
+import price_history
 import os
 
+logger = logging.getLogger(__name__)
+
+# The exchange clients (bitget, hl) pull in ccxt, which is by far the slowest import of the
+# dashboard. They are imported inside the loader functions, so sessions that never press
+# LOAD DATA (and the login screen) don't pay for it.
+
+def update_online_stats(user, table_name, raw_df, record):
+    """
+    Updates the persisted online statistics of the record's strategy with the new row (O(1)).
+    The first time a strategy is seen its state is seeded from the already loaded history.
+    Failures are only logged - the balance itself has been saved at this point.
+    """
+    try:
+        strategy = record['strategy']
+        state_json = get_online_stats(user, table_name).get(strategy)
+
+        if state_json:
+            stats = OnlineStats.from_json(state_json)
+        else:
+            history = raw_df[raw_df['strategy'] == strategy]
+            history = history[pd.to_datetime(history['date_world']) < pd.Timestamp(record['date_world'])]
+            stats = OnlineStats.from_history(history)
+
+        net_pnl = float(record.get('total_pnl', 0) or 0) - float(record.get('deposit', 0) or 0)
+        stats.update(record['date_world'], record.get('collateral', 0) or 0, net_pnl)
+        save_online_stats(user, table_name, strategy, stats.to_json())
+    except Exception as e:
+        logger.warning(f"Error updating online stats for {user} ({record.get('strategy')}): {e}")
+
+def run_price_update(user):
+    """
+    Updates the local BTC/ETH price-history store through the user's Hyperliquid client.
+    """
+    try:
+        from hl import trade_hl
+        client = trade_hl(user, "main")
+        return price_history.update_price_history(client, user, "hyperliquid")
+    except Exception as e:
+        return False, f"Prices Unexpected Error: {e}"
+
 def run_data_loading(exchange_name, user, table_name, raw_df, user_id_val):
     try:
         current_date = datetime.now().date()
@@ -28,6 +68,7 @@ def run_data_loading(exchange_name, user, table_name, raw_df, user_id_val):
                         last_entry[k] = v.item()
 
                 if insert_account_data(user, last_entry, table_name):
+                    update_online_stats(user, table_name, raw_df, last_entry)
                     return True, f"Deribit: Copied data for {current_date}"
                 else:
                     return False, "Deribit: Failed to save data."
@@ -41,6 +82,7 @@ def run_data_loading(exchange_name, user, table_name, raw_df, user_id_val):
             
             if exchange_name == "BitGet":
                 strat_name = "Bitget"
+                from bitget import trade_bitget
                 client = trade_bitget(user, "main")
                 try:
                     data = client.get_balance_collateral(user)
@@ -53,6 +95,7 @@ def run_data_loading(exchange_name, user, table_name, raw_df, user_id_val):
 
             elif exchange_name == "Hyperliquid":
                 strat_name = "HL"
+                from hl import trade_hl
                 client = trade_hl(user, "main")
                 
                 # Dynamic Config Key Detection
@@ -116,6 +159,7 @@ def run_data_loading(exchange_name, user, table_name, raw_df, user_id_val):
                 }
                 
                 if insert_account_data(user, record, table_name):
+                    update_online_stats(user, table_name, raw_df, record)
                     succ_msg = f"{strat_name}: Saved ${total_balance:,.2f} (PnL: {calc_total_pnl:,.2f})"
                     if exchange_name == "Hyperliquid" and fetched_count > 1:
                         succ_msg += f" [Sum of {fetched_count} accounts]"
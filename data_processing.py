@@ -1,7 +1,33 @@
+import hashlib
+
 import pandas as pd
 import numpy as np
 
-def process_account_data(df: pd.DataFrame, strategy: str = "Total_Account"):
+import config
+
+def _use_polars(backend: str = None) -> bool:
+    """
+    Resolves the execution backend ('pandas' or 'polars').
+    Defaults to the DATA_BACKEND setting; polars is an optional dependency.
+    """
+    backend = (backend or config.get_data_backend()).lower()
+    if backend == "pandas":
+        return False
+    if backend == "polars":
+        return True
+    raise ValueError(f"Unknown data backend: {backend}")
+
+def data_version(df: pd.DataFrame) -> str:
+    """
+    Returns a short content hash of a DataFrame.
+    Used as the 'data version' part of cache keys for results derived from it.
+    """
+    if df.empty:
+        return "empty"
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+def process_account_data(df: pd.DataFrame, strategy: str = "Total_Account", backend: str = None):
     """
     Processes the raw data to calculate equity and PnL.
     Handles 'Total_Account' (all strategies combined) or specific strategies.
@@ -9,8 +35,13 @@ def process_account_data(df: pd.DataFrame, strategy: str = "Total_Account"):
     if df.empty:
         return df
 
-    # Convert date to datetime
-    df['date_world'] = pd.to_datetime(df['date_world'])
+    if _use_polars(backend):
+        import data_processing_polars
+        return data_processing_polars.process_account_data(df, strategy)
+
+    # Convert date to datetime (frames converted once up front, e.g. shared ones, are not written)
+    if not pd.api.types.is_datetime64_any_dtype(df['date_world']):
+        df['date_world'] = pd.to_datetime(df['date_world'])
     
     # Filter by strategy if needed
     if strategy != "Total_Account":
@@ -40,12 +71,16 @@ def process_account_data(df: pd.DataFrame, strategy: str = "Total_Account"):
     
     return df
 
-def resample_data(df: pd.DataFrame, freq: str = 'W'):
+def resample_data(df: pd.DataFrame, freq: str = 'W', backend: str = None):
     """
     Resamples data to a different frequency (e.g., 'W' for weekly, 'M' for monthly).
     """
     if df.empty:
         return df
+
+    if _use_polars(backend):
+        import data_processing_polars
+        return data_processing_polars.resample_data(df, freq)
         
     df = df.set_index('date_world')
     
@@ -62,13 +97,17 @@ def resample_data(df: pd.DataFrame, freq: str = 'W'):
     
     return resampled.reset_index()
 
-def calculate_monthly_heatmap_data(df: pd.DataFrame, pnl_col: str = 'total_pnl'):
+def calculate_monthly_heatmap_data(df: pd.DataFrame, pnl_col: str = 'total_pnl', backend: str = None):
     """
     Prepares data for the monthly returns heatmap.
     Returns a pivot table for PnL (absolute) and one for returns (percentage).
     """
     if df.empty:
         return pd.DataFrame(), pd.DataFrame()
+
+    if _use_polars(backend):
+        import data_processing_polars
+        return data_processing_polars.calculate_monthly_heatmap_data(df, pnl_col)
         
     # Ensure we have datetime index
     df = df.copy()
@@ -127,3 +166,36 @@ def calculate_monthly_heatmap_data(df: pd.DataFrame, pnl_col: str = 'total_pnl')
     pct_pivot = pct_pivot.reindex(columns=existing_months)
     
     return pnl_pivot, pct_pivot
+
+def pivot_strategy_equity(df: pd.DataFrame, start_date=None, freq: str = None, top_n: int = None):
+    """
+    Equity (collateral) per strategy as a date x strategy matrix, from start_date on.
+    With freq ('W', 'ME', ...) each period keeps its last day. With top_n, the strategies
+    beyond the top_n largest (by mean equity) are summed into one 'Other (<n> strategies)'
+    column, named so it can't replace a kept strategy column.
+    Days a strategy has no row count as 0. The input frame is not modified.
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    dates = pd.to_datetime(df['date_world'])
+    mask = dates >= pd.Timestamp(start_date) if start_date is not None else slice(None)
+    matrix = (df.loc[mask, ['strategy', 'collateral']]
+              .assign(date_world=dates[mask])
+              .pivot_table(index='date_world', columns='strategy', values='collateral', aggfunc='sum', fill_value=0)
+              .sort_index())
+    matrix.columns.name = None
+
+    if freq is not None:
+        matrix = matrix.resample(freq).last().dropna(how='all')
+
+    if top_n is not None and len(matrix.columns) > top_n:
+        # Stable sort: strategies with the same mean equity keep their (alphabetical) order
+        ranked = matrix.mean().sort_values(ascending=False, kind='stable').index
+        top, rest = list(ranked[:top_n]), list(ranked[top_n:])
+        other = f"Other ({len(rest)} {'strategy' if len(rest) == 1 else 'strategies'})"
+        while other in top:
+            other += "*"
+        matrix = matrix[top].assign(**{other: matrix[rest].sum(axis=1)})
+
+    return matrix
@@ -0,0 +1,175 @@
+import pandas as pd
+import polars as pl
+
+# Polars implementation of the data_processing functions.
+# Takes and returns pandas DataFrames so callers (app.py, daily_update.py) don't need to change;
+# the work in between runs as a lazy, multi-threaded Polars query plan.
+
+AGG_COLS = ['collateral', 'total_pnl', 'deposit', 'withdrawal', 'btc_pnl', 'eth_pnl']
+
+# pandas resample rule -> polars window size
+FREQ_MAP = {
+    'D': '1d',
+    'W': '1w',
+    'W-SUN': '1w',
+    'M': '1mo',
+    'ME': '1mo',
+    'Q': '1q',
+    'QE': '1q',
+    'Y': '1y',
+    'YE': '1y',
+    'A': '1y',
+}
+
+MONTH_ORDER = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def _to_lazy(df: pd.DataFrame) -> pl.LazyFrame:
+    """
+    Converts a pandas frame to a LazyFrame, casting the numeric columns to Float64
+    (DB NUMERIC columns can arrive as Decimal objects).
+    """
+    lf = pl.from_pandas(df).lazy()
+    numeric = [c for c in AGG_COLS + ['pos_size'] if c in df.columns]
+    return lf.with_columns([pl.col(c).cast(pl.Float64) for c in numeric])
+
+
+def process_account_data(df: pd.DataFrame, strategy: str = "Total_Account"):
+    """
+    Polars version of data_processing.process_account_data.
+    Like the pandas version, converts df['date_world'] to datetime in place
+    (the date strings are parsed by polars, which is much faster than pd.to_datetime).
+    """
+    if df.empty:
+        return df
+
+    if not pd.api.types.is_datetime64_any_dtype(df['date_world']):
+        dates = pl.from_pandas(df['date_world'])
+        try:
+            # date_world is stored as TEXT 'YYYY-MM-DD'; an explicit format avoids slow inference
+            dates = dates.str.to_datetime('%Y-%m-%d', time_unit='us')
+        except pl.exceptions.InvalidOperationError:
+            dates = dates.str.to_datetime(time_unit='us')
+        df['date_world'] = dates.to_pandas().values
+
+    if strategy != "Total_Account":
+        # Keep the original pandas index, like the boolean filter in the pandas version
+        lf = _to_lazy(df).with_row_index('__row')
+        lf = lf.filter(pl.col('strategy') == strategy)
+    else:
+        lf = (
+            _to_lazy(df[['date_world'] + AGG_COLS])
+            .filter(pl.col('date_world').is_not_null())
+            .group_by('date_world')
+            .agg([pl.col(c).sum() for c in AGG_COLS])
+        )
+
+    lf = (
+        lf.sort('date_world', nulls_last=True, maintain_order=True)
+        .with_columns(
+            pl.col('collateral').alias('equity'),
+            (pl.col('total_pnl') - pl.col('deposit')).alias('net_pnl'),
+        )
+        .with_columns(pl.col('net_pnl').cum_sum().alias('cum_pnl'))
+    )
+
+    out = lf.collect()
+
+    if strategy != "Total_Account":
+        index = df.index[out['__row'].to_numpy()]
+        result = out.drop('__row').to_pandas()
+        result.index = index
+        return result
+
+    return out.to_pandas()
+
+
+def resample_data(df: pd.DataFrame, freq: str = 'W'):
+    """
+    Polars version of data_processing.resample_data, using group_by_dynamic.
+    Periods are labelled by their last day and empty periods are kept, as pandas does.
+    """
+    if df.empty:
+        return df
+
+    if freq not in FREQ_MAP:
+        raise ValueError(f"Unsupported frequency for polars backend: {freq}")
+    every = FREQ_MAP[freq]
+
+    lf = _to_lazy(df[['date_world', 'equity', 'total_pnl', 'net_pnl', 'deposit',
+                      'withdrawal', 'btc_pnl', 'eth_pnl', 'cum_pnl']])
+    lf = lf.filter(pl.col('date_world').is_not_null()).sort('date_world')
+
+    sum_cols = ['total_pnl', 'net_pnl', 'deposit', 'withdrawal', 'btc_pnl', 'eth_pnl']
+    agg = lf.group_by_dynamic('date_world', every=every, closed='left', label='left').agg(
+        pl.col('equity').drop_nulls().last(),
+        *[pl.col(c).sum() for c in sum_cols],
+        pl.col('cum_pnl').drop_nulls().last(),
+    )
+
+    # Fill in periods without any rows (pandas resample emits them with 0 sums / NaN lasts)
+    periods = agg.select(
+        pl.datetime_range(
+            pl.col('date_world').min(), pl.col('date_world').max(), interval=every
+        ).alias('date_world')
+    )
+    out = (
+        periods.join(agg, on='date_world', how='left')
+        .with_columns([pl.col(c).fill_null(0.0) for c in sum_cols])
+        # Label each period by its last day (pandas 'W' -> Sunday, 'ME' -> month end, ...)
+        .with_columns(pl.col('date_world').dt.offset_by(every).dt.offset_by('-1d'))
+        .select(['date_world', 'equity', 'total_pnl', 'net_pnl', 'deposit',
+                 'withdrawal', 'btc_pnl', 'eth_pnl', 'cum_pnl'])
+        .collect()
+    )
+
+    return out.to_pandas()
+
+
+def calculate_monthly_heatmap_data(df: pd.DataFrame, pnl_col: str = 'total_pnl'):
+    """
+    Polars version of data_processing.calculate_monthly_heatmap_data.
+    Returns the PnL and percentage-return pivots as pandas DataFrames.
+    """
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    lf = _to_lazy(df[['date_world', 'collateral', pnl_col]]).with_columns(
+        pl.col('date_world').cast(pl.Datetime)
+    )
+
+    monthly = (
+        lf.with_columns(
+            pl.col('date_world').dt.year().cast(pl.Int64).alias('year'),
+            pl.col('date_world').dt.month().alias('month_num'),
+        )
+        .group_by(['year', 'month_num'], maintain_order=True)
+        .agg(
+            pl.col('date_world').first().dt.strftime('%B').alias('month'),
+            pl.col(pnl_col).sum().alias('total_pnl'),
+            pl.col('collateral').first().alias('start_equity'),
+        )
+        .with_columns(
+            pl.when(pl.col('start_equity') == 0)
+            .then(0.0)
+            .otherwise(pl.col('total_pnl') / pl.col('start_equity') * 100)
+            .alias('pct_return')
+        )
+        .sort(['year', 'month_num'])
+        .collect()
+    )
+
+    if monthly.is_empty():
+        return pd.DataFrame(), pd.DataFrame()
+
+    monthly_df = monthly.select(['year', 'month', 'total_pnl', 'pct_return']).to_pandas()
+
+    pnl_pivot = monthly_df.pivot(index='year', columns='month', values='total_pnl')
+    pct_pivot = monthly_df.pivot(index='year', columns='month', values='pct_return')
+
+    existing_months = [m for m in MONTH_ORDER if m in pnl_pivot.columns]
+    pnl_pivot = pnl_pivot.reindex(columns=existing_months)
+    pct_pivot = pct_pivot.reindex(columns=existing_months)
+
+    return pnl_pivot, pct_pivot
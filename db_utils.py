@@ -1,5 +1,6 @@
+import io
+import logging
 import psycopg2
-import streamlit as st
 import pandas as pd
 from typing import List, Optional
 from sqlalchemy import create_engine
@@ -9,6 +10,13 @@ from datetime import datetime
 import config
 from urllib.parse import quote_plus
 
+# Errors are logged (and the functions return None / False / empty results);
+# the dashboard shows logged errors on the page through streamlit_adapter.
+logger = logging.getLogger(__name__)
+
+# SQLAlchemy engines (and their connection pools) per database URL, created once per process
+_engines = {}
+
 def get_connection(user_key: str):
     """
     Creates a raw psycopg2 connection to the database for a specific user.
@@ -34,12 +42,12 @@ def get_connection(user_key: str):
         )
         return conn
     except Exception as e:
-        st.error(f"Error connecting to database for {user_key}: {e}")
+        logger.error(f"Error connecting to database for {user_key}: {e}")
         return None
 
 def get_db_engine(user_key: str):
     """
-    Creates a SQLAlchemy engine for a specific user.
+    Returns the SQLAlchemy engine for a specific user (created on first use).
     Used for reading data with pandas.
     """
     try:
@@ -60,9 +68,11 @@ def get_db_engine(user_key: str):
             
             url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}"
             
-        return create_engine(url)
+        if url not in _engines:
+            _engines[url] = create_engine(url)
+        return _engines[url]
     except Exception as e:
-        st.error(f"Error creating database engine for {user_key}: {e}")
+        logger.error(f"Error creating database engine for {user_key}: {e}")
         return None
 
 def fetch_data(user_key: str, query: str = None, table_name: str = None) -> pd.DataFrame:
@@ -86,7 +96,7 @@ def fetch_data(user_key: str, query: str = None, table_name: str = None) -> pd.D
         
         return df
     except Exception as e:
-        st.error(f"Error fetching data for {user_key}: {e}")
+        logger.error(f"Error fetching data for {user_key}: {e}")
         return pd.DataFrame()
 
 def get_all_user_data(user_keys: List[str], table_name: str = "account_data") -> pd.DataFrame:
@@ -128,9 +138,68 @@ def get_latest_data(user_key: str, table_name: str = None) -> pd.DataFrame:
         
         return df
     except Exception as e:
-        st.error(f"Error fetching latest data for {user_key}: {e}")
+        logger.error(f"Error fetching latest data for {user_key}: {e}")
         return pd.DataFrame()
 
+def get_strategies(user_key: str, table_name: str) -> List[str]:
+    """
+    Returns the distinct strategy names of a user's table (sorted).
+    Cheap enough to build the strategy selection before the full history is loaded.
+    """
+    engine = get_db_engine(user_key)
+    if engine is None:
+        return []
+
+    try:
+        query = f'SELECT DISTINCT "strategy" FROM "{table_name}" WHERE "strategy" IS NOT NULL ORDER BY 1'
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn)
+        return df['strategy'].tolist()
+    except Exception as e:
+        logger.error(f"Error fetching strategies for {user_key}: {e}")
+        return []
+
+def get_kpi_summary(user_key: str, table_name: str, start_date, strategy: str = None) -> Optional[dict]:
+    """
+    Returns the dashboard KPIs straight from the table in one small aggregate query:
+    {'last_date', 'balance' (collateral summed on the latest day), 'pnl_since_start'
+    (total_pnl - deposit summed from start_date on)}. strategy=None means the whole account.
+    Returns None on error or if there is no data.
+    """
+    engine = get_db_engine(user_key)
+    if engine is None:
+        return None
+
+    try:
+        where = 'WHERE "strategy" = %(strategy)s' if strategy else ''
+        query = f"""
+            WITH rows AS (
+                SELECT "date_world", "collateral",
+                       COALESCE("total_pnl", 0) - COALESCE("deposit", 0) AS net_pnl
+                FROM "{table_name}" {where}
+            ),
+            last_day AS (SELECT MAX("date_world") AS date_world FROM rows)
+            SELECT
+                (SELECT date_world FROM last_day) AS last_date,
+                (SELECT SUM("collateral") FROM rows WHERE "date_world" = (SELECT date_world FROM last_day)) AS balance,
+                (SELECT COALESCE(SUM(net_pnl), 0) FROM rows WHERE "date_world" >= %(start_date)s) AS pnl_since_start
+        """
+        params = {'start_date': str(start_date), 'strategy': strategy}
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+
+        if df.empty or pd.isna(df.loc[0, 'last_date']):
+            return None
+        row = df.iloc[0]
+        return {
+            'last_date': row['last_date'],
+            'balance': float(row['balance'] or 0),
+            'pnl_since_start': float(row['pnl_since_start'] or 0),
+        }
+    except Exception as e:
+        logger.error(f"Error fetching KPI summary for {user_key}: {e}")
+        return None
+
 def insert_account_data(user_key: str, data_dict: dict, table_name: str = None):
     """
     Inserts a new record into the database.
@@ -148,7 +217,7 @@ def insert_account_data(user_key: str, data_dict: dict, table_name: str = None):
         strategy = data_dict.get('strategy')
         
         if not date_world or not strategy:
-            st.error("Missing date_world or strategy for insertion.")
+            logger.error("Missing date_world or strategy for insertion.")
             return False
 
         # Ensure date_world is a string to match DB TEXT column (prevents 'operator does not exist: text = date')
@@ -189,7 +258,7 @@ def insert_account_data(user_key: str, data_dict: dict, table_name: str = None):
         return True
         
     except Exception as e:
-        st.error(f"Error inserting data for {user_key}: {e}")
+        logger.error(f"Error inserting data for {user_key}: {e}")
         if conn:
             conn.rollback()
             conn.close()
@@ -237,7 +306,7 @@ def initialize_user_table(user_key: str):
         conn.close()
         return True
     except Exception as e:
-        st.error(f"Error initializing user table for {user_key}: {e}")
+        logger.error(f"Error initializing user table for {user_key}: {e}")
         if conn:
             conn.rollback()
             conn.close()
@@ -272,7 +341,7 @@ def verify_user(user_key: str, username: str, password: str):
             if initialize_user_table(user_key):
                 return verify_user(user_key, username, password)
         
-        st.error(f"Error verifying user for {user_key}: {e}")
+        logger.error(f"Error verifying user for {user_key}: {e}")
         if conn:
             conn.close()
         return False, None
@@ -298,8 +367,297 @@ def update_user_password(user_key: str, username: str, new_password: str):
         conn.close()
         return True
     except Exception as e:
-        st.error(f"Error updating password for {username}: {e}")
+        logger.error(f"Error updating password for {username}: {e}")
+        if conn:
+            conn.rollback()
+            conn.close()
+        return False
+
+def create_account_table(user_key: str, table_name: str):
+    """
+    Creates an account data table with the schema insert_account_data writes to.
+    date_world is TEXT ('YYYY-MM-DD') like the existing tables.
+    """
+    conn = get_connection(user_key)
+    if conn is None:
+        return False
+
+    try:
+        cursor = conn.cursor()
+        create_query = f"""
+            CREATE TABLE IF NOT EXISTS "{table_name}" (
+                date_world TEXT,
+                collateral DOUBLE PRECISION,
+                strategy TEXT,
+                total_pnl DOUBLE PRECISION,
+                deposit DOUBLE PRECISION,
+                withdrawal DOUBLE PRECISION,
+                btc_pnl DOUBLE PRECISION,
+                eth_pnl DOUBLE PRECISION,
+                user_id TEXT,
+                pos_size DOUBLE PRECISION
+            )
+        """
+        cursor.execute(create_query)
+        conn.commit()
+        cursor.close()
+        conn.close()
+        return True
+    except Exception as e:
+        logger.error(f"Error creating table {table_name} for {user_key}: {e}")
         if conn:
             conn.rollback()
             conn.close()
         return False
+
+def bulk_copy_account_data(user_key: str, chunks, table_name: str):
+    """
+    Bulk loads account rows with COPY ... FROM STDIN, one chunk (DataFrame) at a time.
+    Much faster than insert_account_data for large loads; does not delete existing rows.
+    Returns the number of rows written, or None on failure.
+    """
+    conn = get_connection(user_key)
+    if conn is None:
+        return None
+
+    columns = ['date_world', 'collateral', 'strategy', 'total_pnl', 'deposit', 'withdrawal',
+               'btc_pnl', 'eth_pnl', 'user_id', 'pos_size']
+    copy_query = f'COPY "{table_name}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)'
+
+    try:
+        cursor = conn.cursor()
+        total = 0
+        for chunk in chunks:
+            buffer = io.StringIO()
+            chunk[columns].to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(copy_query, buffer)
+            total += len(chunk)
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        return total
+    except Exception as e:
+        logger.error(f"Error bulk loading data into {table_name} for {user_key}: {e}")
+        if conn:
+            conn.rollback()
+            conn.close()
+        return None
+
+def get_online_stats(user_key: str, table_name: str) -> dict:
+    """
+    Returns the persisted online statistics state per strategy ({strategy: state_json})
+    from the "<table_name>_online_stats" table. Empty dict if none exist yet.
+    """
+    engine = get_db_engine(user_key)
+    if engine is None:
+        return {}
+
+    try:
+        query = f'SELECT strategy, state FROM "{table_name}_online_stats"'
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn)
+        return dict(zip(df['strategy'], df['state']))
+    except Exception as e:
+        # Table is created on first save
+        if "does not exist" in str(e).lower():
+            return {}
+        logger.error(f"Error fetching online stats for {user_key}: {e}")
+        return {}
+
+def save_online_stats(user_key: str, table_name: str, strategy: str, state_json: str):
+    """
+    Upserts the online statistics state of one strategy.
+    """
+    conn = get_connection(user_key)
+    if conn is None:
+        return False
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS "{table_name}_online_stats" (
+                strategy TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+        """)
+        cursor.execute(f"""
+            INSERT INTO "{table_name}_online_stats" (strategy, state, updated_at)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (strategy) DO UPDATE SET state = EXCLUDED.state, updated_at = EXCLUDED.updated_at
+        """, (strategy, state_json, datetime.now()))
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        return True
+    except Exception as e:
+        logger.error(f"Error saving online stats for {user_key}: {e}")
+        if conn:
+            conn.rollback()
+            conn.close()
+        return False
+
+PRICE_COLUMNS = ['date_world', 'open', 'high', 'low', 'close', 'volume']
+
+def get_price_history(user_key: str, asset: str) -> pd.DataFrame:
+    """
+    Returns the stored daily candles of one benchmark asset from the shared "price_history"
+    table (columns: date_world, open, high, low, close, volume). Empty frame if none exist yet.
+    """
+    engine = get_db_engine(user_key)
+    if engine is None:
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+
+    try:
+        query = f'SELECT {", ".join(PRICE_COLUMNS)} FROM price_history WHERE asset = %(asset)s ORDER BY date_world'
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn, params={'asset': asset})
+        df['date_world'] = pd.to_datetime(df['date_world'])
+        return df
+    except Exception as e:
+        # Table is created on first save
+        if "does not exist" not in str(e).lower():
+            logger.error(f"Error fetching price history of {asset} for {user_key}: {e}")
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+
+def save_price_history(user_key: str, asset: str, df: pd.DataFrame):
+    """
+    Upserts daily candles of one benchmark asset (a candle stored earlier for the same day is replaced).
+    """
+    conn = get_connection(user_key)
+    if conn is None:
+        return False
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS price_history (
+                asset TEXT NOT NULL,
+                date_world DATE NOT NULL,
+                open DOUBLE PRECISION,
+                high DOUBLE PRECISION,
+                low DOUBLE PRECISION,
+                close DOUBLE PRECISION,
+                volume DOUBLE PRECISION,
+                PRIMARY KEY (asset, date_world)
+            )
+        """)
+        rows = [
+            (asset, pd.Timestamp(r.date_world).date(), float(r.open), float(r.high), float(r.low),
+             float(r.close), float(r.volume))
+            for r in df[PRICE_COLUMNS].itertuples(index=False)
+        ]
+        cursor.executemany("""
+            INSERT INTO price_history (asset, date_world, open, high, low, close, volume)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (asset, date_world) DO UPDATE SET open = EXCLUDED.open, high = EXCLUDED.high,
+                low = EXCLUDED.low, close = EXCLUDED.close, volume = EXCLUDED.volume
+        """, rows)
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        return True
+    except Exception as e:
+        logger.error(f"Error saving price history of {asset} for {user_key}: {e}")
+        if conn:
+            conn.rollback()
+            conn.close()
+        return False
+
+def get_snapshot(user_key: str, table_name: str) -> dict:
+    """
+    Returns the stored dashboard snapshot of a table as {name: payload bytes} from the
+    "<table_name>_snapshots" table (one consistent read). Empty dict if none exists yet.
+    """
+    engine = get_db_engine(user_key)
+    if engine is None:
+        return {}
+
+    try:
+        query = f'SELECT name, payload FROM "{table_name}_snapshots"'
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn)
+        return {name: bytes(payload) for name, payload in zip(df['name'], df['payload'])}
+    except Exception as e:
+        # Table is created on first save
+        if "does not exist" not in str(e).lower():
+            logger.error(f"Error fetching snapshot of {table_name} for {user_key}: {e}")
+        return {}
+
+def get_snapshot_created(user_key: str, table_name: str):
+    """
+    Returns when the snapshot of a table was written (None if there is none).
+    """
+    engine = get_db_engine(user_key)
+    if engine is None:
+        return None
+
+    try:
+        query = f'SELECT MAX(created_at) AS created_at FROM "{table_name}_snapshots"'
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn)
+        created = df['created_at'].iloc[0]
+        return None if pd.isna(created) else pd.Timestamp(created)
+    except Exception as e:
+        if "does not exist" not in str(e).lower():
+            logger.error(f"Error fetching snapshot time of {table_name} for {user_key}: {e}")
+        return None
+
+def save_snapshot(user_key: str, table_name: str, history_version: str, payloads: dict):
+    """
+    Replaces the snapshot of a table with `payloads` ({name: bytes}) in one transaction,
+    so readers see either the old or the new snapshot, never a mix.
+    """
+    conn = get_connection(user_key)
+    if conn is None:
+        return False
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS "{table_name}_snapshots" (
+                name TEXT PRIMARY KEY,
+                history_version TEXT NOT NULL,
+                payload BYTEA NOT NULL,
+                created_at TIMESTAMP NOT NULL
+            )
+        """)
+        cursor.execute(f'DELETE FROM "{table_name}_snapshots"')
+        created = datetime.now()
+        cursor.executemany(f"""
+            INSERT INTO "{table_name}_snapshots" (name, history_version, payload, created_at)
+            VALUES (%s, %s, %s, %s)
+        """, [(name, history_version, psycopg2.Binary(payload), created) for name, payload in payloads.items()])
+
+        conn.commit()
+        cursor.close()
+        conn.close()
+        return True
+    except Exception as e:
+        logger.error(f"Error saving snapshot of {table_name} for {user_key}: {e}")
+        if conn:
+            conn.rollback()
+            conn.close()
+        return False
+
+def get_table_stamp(user_key: str, table_name: str):
+    """
+    Returns (last date_world, row count) of an account table: a cheap stamp that changes
+    whenever rows are loaded. None on error.
+    """
+    engine = get_db_engine(user_key)
+    if engine is None:
+        return None
+
+    try:
+        query = f'SELECT MAX("date_world") AS last_date, COUNT(*) AS n_rows FROM "{table_name}"'
+        with engine.connect() as conn:
+            df = pd.read_sql_query(query, conn)
+        return str(df['last_date'].iloc[0]), int(df['n_rows'].iloc[0])
+    except Exception as e:
+        logger.error(f"Error fetching table stamp of {table_name} for {user_key}: {e}")
+        return None
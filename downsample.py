@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Downsampling of long series for plotting.
+# Line / area series are reduced with LTTB (largest triangle three buckets) or min-max buckets,
+# which keep the visual shape; bar series are aggregated into buckets of consecutive rows.
+# All functions return new frames and keep the first and last row.
+
+
+def _as_numeric(values) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Row positions selected by LTTB: the first and last point plus, for each of n_out - 2
+    buckets, the point forming the largest triangle with the previous pick and the next bucket's mean.
+    """
+    x = _as_numeric(x)
+    y = np.nan_to_num(_as_numeric(y))
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        next_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[prev] - next_x) * (by - y[prev]) - (x[prev] - bx) * (next_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        picks[i + 1] = prev
+    return picks
+
+
+def minmax_indices(y, n_buckets: int) -> np.ndarray:
+    """
+    Row positions of the minimum and maximum of each of n_buckets equal buckets (plus first
+    and last row), in original order. Keeps every spike, at up to 2 points per bucket.
+    """
+    y = np.nan_to_num(_as_numeric(y))
+    n = len(y)
+    if 2 * n_buckets + 2 >= n or n_buckets < 1:
+        return np.arange(n)
+
+    bucket = np.arange(n) * n_buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets), side='left')
+    ends = np.append(starts[1:], n) - 1
+    picks = np.concatenate([[0, n - 1], order[starts], order[ends]])
+    return np.unique(picks)
+
+
+def downsample(df: pd.DataFrame, x: str, y: str, max_points: int, method: str = 'lttb') -> pd.DataFrame:
+    """
+    Returns at most about max_points rows of df for plotting y over x ('lttb' or 'minmax').
+    """
+    if len(df) <= max_points:
+        return df
+    if method == 'lttb':
+        picks = lttb_indices(df[x].to_numpy(), df[y].to_numpy(), max_points)
+    elif method == 'minmax':
+        picks = minmax_indices(df[y].to_numpy(), max(1, (max_points - 2) // 2))
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return df.iloc[picks]
+
+
+def aggregate_bars(df: pd.DataFrame, x: str, y: str, max_bars: int, agg: str = 'sum'):
+    """
+    Aggregates consecutive rows into buckets so at most max_bars bars remain.
+    Each bucket is labelled with its last x value; y is summed ('sum', for per-period PnL)
+    or the bucket's last value is kept ('last', for cumulative series).
+    Returns (frame, rows per bucket).
+    """
+    n = len(df)
+    if n <= max_bars:
+        return df, 1
+    size = -(-n // max_bars)
+    bucket = np.arange(n) // size
+    grouped = df[[x, y]].groupby(bucket, sort=True)
+    result = pd.DataFrame({x: grouped[x].last(), y: grouped[y].agg(agg)})
+    return result.reset_index(drop=True), size
@@ -0,0 +1,96 @@
+import glob
+import hashlib
+import os
+import re
+import threading
+
+import pandas as pd
+
+import config
+
+# File exports of the dashboard data (raw rows, processed daily series, rollups).
+# Files are written to EXPORT_DIR chunk by chunk, so at most CHUNK_ROWS rows are converted to
+# CSV text / Arrow at a time, and are kept per (export name, data version): asking again for
+# the same data serves the existing file, a new data version replaces it. The name must
+# therefore identify the view (frame, strategy, start date, columns), so that sessions with
+# different views don't replace each other's files.
+
+CHUNK_ROWS = 50_000
+
+FORMATS = {
+    'csv': "text/csv",
+    'parquet': "application/vnd.apache.parquet",
+}
+
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """
+    Yields the CSV encoding of df as bytes, CHUNK_ROWS rows at a time (header in the first chunk).
+    """
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=(start == 0)).encode()
+
+
+def write_csv(df: pd.DataFrame, path: str, chunk_rows: int = CHUNK_ROWS):
+    with open(path, "wb") as f:
+        for chunk in iter_csv_chunks(df, chunk_rows):
+            f.write(chunk)
+
+
+def write_parquet(df: pd.DataFrame, path: str, chunk_rows: int = CHUNK_ROWS):
+    # One row group per chunk; the schema is fixed up front so all chunks agree on the types
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS = {
+    'csv': write_csv,
+    'parquet': write_parquet,
+}
+
+
+def export_key(*parts) -> str:
+    """
+    Short hash of the given parts, e.g. the data version or the view settings of an export.
+    """
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+def export_file(df: pd.DataFrame, name: str, key: str, fmt: str = 'parquet') -> str:
+    """
+    Returns the path of the export of df as `fmt`, writing it first unless the file for this
+    (name, key) already exists. Exports under the same name with another key (older data
+    versions of the same view) are removed.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+    export_dir = config.get_export_dir()
+    path = os.path.join(export_dir, f"{name}_{key}.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(export_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    WRITERS[fmt](df, tmp)
+    os.replace(tmp, path)
+
+    for old in glob.glob(os.path.join(glob.escape(export_dir), f"{glob.escape(name)}_{'?' * len(key)}.{fmt}")):
+        if old != path:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def read_export(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,146 @@
+import json
+import math
+
+import pandas as pd
+
+# Online (streaming) statistics per (user, strategy).
+# Each new daily row updates the state in O(1), so live updates never rescan the history:
+#   - Welford running mean / variance of daily net PnL
+#   - running peak equity for current and max drawdown
+#   - EWMA volatility of daily returns (RiskMetrics style, lambda = 0.94)
+# The state is a small JSON dict persisted by db_utils.save_online_stats.
+
+EWMA_LAMBDA = 0.94
+
+
+class OnlineStats():
+    '''
+    Running statistics for one strategy of one user.
+
+    update(date_world, equity, net_pnl) adds one daily observation. Re-running the loader on
+    the same day replaces that day's observation (the DB row is replaced as well), so the
+    state keeps a snapshot from before the last update.
+    '''
+
+    FIELDS = ['count', 'mean', 'm2', 'peak_equity', 'max_drawdown', 'ewma_var',
+              'last_equity', 'last_date']
+
+    def __init__(self, state: dict = None):
+        self._restore(state or {})
+
+    def _restore(self, state: dict):
+        self.count = state.get('count', 0)
+        self.mean = state.get('mean', 0.0)
+        self.m2 = state.get('m2', 0.0)
+        self.peak_equity = state.get('peak_equity')
+        self.max_drawdown = state.get('max_drawdown', 0.0)
+        self.ewma_var = state.get('ewma_var')
+        self.last_equity = state.get('last_equity')
+        self.last_date = state.get('last_date')
+        self._prev = state.get('prev')
+
+    def _snapshot(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def update(self, date_world, equity: float, net_pnl: float) -> bool:
+        """
+        Adds one daily observation. Returns False (and ignores it) if the date is
+        older than the last observation.
+        """
+        date_str = pd.Timestamp(date_world).strftime('%Y-%m-%d')
+
+        if self.last_date is not None:
+            if date_str < self.last_date:
+                return False
+            if date_str == self.last_date and self._prev is not None:
+                # Same day again: undo the previous update of this day first
+                self._restore(self._prev)
+
+        self._prev = self._snapshot()
+
+        equity = float(equity)
+        net_pnl = float(net_pnl)
+
+        # Welford
+        self.count += 1
+        delta = net_pnl - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (net_pnl - self.mean)
+
+        # Drawdown
+        if self.peak_equity is None or equity > self.peak_equity:
+            self.peak_equity = equity
+        if self.peak_equity > 0:
+            self.max_drawdown = min(self.max_drawdown, (equity - self.peak_equity) / self.peak_equity)
+
+        # EWMA volatility of the daily return on the previous day's equity
+        if self.last_equity:
+            ret = net_pnl / self.last_equity
+            if self.ewma_var is None:
+                self.ewma_var = ret ** 2
+            else:
+                self.ewma_var = EWMA_LAMBDA * self.ewma_var + (1 - EWMA_LAMBDA) * ret ** 2
+
+        self.last_equity = equity
+        self.last_date = date_str
+        return True
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def current_drawdown(self):
+        if not self.peak_equity or self.last_equity is None:
+            return 0.0
+        return (self.last_equity - self.peak_equity) / self.peak_equity
+
+    @property
+    def ewma_vol(self):
+        """Annualized EWMA volatility (crypto trades 365 days)."""
+        return math.sqrt(self.ewma_var * 365) if self.ewma_var is not None else 0.0
+
+    def to_dict(self) -> dict:
+        state = self._snapshot()
+        state['prev'] = self._prev
+        return state
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, text: str):
+        return cls(json.loads(text)) if text else cls()
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame):
+        """
+        Builds the state by replaying existing rows of one strategy (used once, to seed
+        a strategy that has no persisted state yet).
+        """
+        stats = cls()
+        if df.empty:
+            return stats
+        df = df.assign(_date=pd.to_datetime(df['date_world'])).sort_values('_date')
+        net_pnl = df['total_pnl'].fillna(0) - df['deposit'].fillna(0)
+        for date_world, equity, pnl in zip(df['_date'], df['collateral'].fillna(0), net_pnl):
+            stats.update(date_world, equity, pnl)
+        return stats
+
+    def summary(self) -> dict:
+        """
+        Display values for the dashboard.
+        """
+        return {
+            'Last Date': self.last_date,
+            'Days': self.count,
+            'Mean Daily PnL': self.mean,
+            'Std Daily PnL': self.std,
+            'EWMA Vol (ann. %)': self.ewma_vol * 100,
+            'Drawdown (%)': self.current_drawdown * 100,
+            'Max Drawdown (%)': self.max_drawdown * 100,
+        }
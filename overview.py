@@ -0,0 +1,92 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Admin overview of all users: balance, PnL over a period and an equity sparkline per user.
+# Users are loaded concurrently (the work is mostly waiting on the database), so the page
+# takes about as long as the slowest user instead of the sum of all of them.
+
+PERIODS = {
+    "7D": "Last 7 days",
+    "30D": "Last 30 days",
+    "MTD": "Month to date",
+    "YTD": "Year to date",
+    "ALL": "All time",
+}
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERIOD = "30D"
+SPARK_POINTS = 60
+MAX_WORKERS = 8
+
+
+def period_start(last_date, period: str) -> pd.Timestamp:
+    """
+    First day of the period ending on last_date.
+    """
+    last_date = pd.Timestamp(last_date).normalize()
+    if period == "7D":
+        return last_date - pd.Timedelta(days=6)
+    if period == "30D":
+        return last_date - pd.Timedelta(days=29)
+    if period == "MTD":
+        return last_date.replace(day=1)
+    if period == "YTD":
+        return last_date.replace(month=1, day=1)
+    if period == "ALL":
+        return pd.Timestamp.min
+    raise ValueError(f"Unknown overview period: {period}")
+
+
+def summarize_user(proc_df: pd.DataFrame, period: str, pnl_col: str = 'net_pnl',
+                   spark_points: int = SPARK_POINTS) -> dict:
+    """
+    Summary of one processed (Total_Account) frame: balance on the last day, PnL and return
+    over the period, and the period's equity as a list of at most spark_points values.
+    """
+    if proc_df.empty:
+        return {'Last Date': None, 'Balance': np.nan, 'Period PnL': np.nan, 'Period Return (%)': np.nan, 'Equity': []}
+
+    last_date = proc_df['date_world'].iloc[-1]
+    in_period = proc_df[proc_df['date_world'] >= period_start(last_date, period)]
+    period_pnl = float(in_period[pnl_col].sum())
+
+    # Return on the equity at the start of the period (before the first day's PnL)
+    start_equity = float(in_period['equity'].iloc[0] - in_period[pnl_col].iloc[0]) if not in_period.empty else 0.0
+    period_return = period_pnl / start_equity * 100 if start_equity else np.nan
+
+    equity = in_period['equity'].to_numpy(dtype=float)
+    if len(equity) > spark_points:
+        equity = equity[np.linspace(0, len(equity) - 1, spark_points).astype(int)]
+
+    return {
+        'Last Date': pd.Timestamp(last_date).date(),
+        'Balance': float(proc_df['equity'].iloc[-1]),
+        'Period PnL': period_pnl,
+        'Period Return (%)': period_return,
+        'Equity': equity.round(2).tolist(),
+    }
+
+
+def build_overview(users, summarize, max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Runs summarize(user) -> dict for all users concurrently and returns one row per user
+    (in the given order). A failing user gets an empty row instead of failing the page.
+    """
+    def run(user):
+        try:
+            return summarize(user)
+        except Exception as e:
+            logger.error(f"Error summarizing {user}: {e}")
+            return summarize_user(pd.DataFrame(), "ALL")
+
+    workers = max(1, min(max_workers, len(users)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(run, users))
+
+    overview = pd.DataFrame(rows)
+    overview.insert(0, 'User', list(users))
+    return overview
@@ -0,0 +1,211 @@
+import contextlib
+import functools
+import time
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import config
+
+# Render timings of the dashboard, kept per session.
+# A full script run is timed between start_run() and end_run(); every fragment decorated with
+# timed_fragment() records its own time, separately for runs inside a full rerun and for
+# isolated fragment reruns (e.g. toggling one chart). The difference is the time saved by not
+# rerunning the whole script.
+# Within a run, stage() times individual steps (data load, processing, each figure build / send);
+# the last PERF_HISTORY_RUNS runs are kept for rolling averages and the CSV export.
+
+STATE_KEY = 'perf_timings'
+
+
+def _timings():
+    if STATE_KEY not in st.session_state:
+        st.session_state[STATE_KEY] = {
+            'run_start': None,
+            'in_full_run': False,
+            'full_run': None,
+            'fragments': {},
+            'panel': None,
+            'run_id': 0,
+            'run_kind': None,
+            'stages': [],
+            'open_stages': [],
+            'history': deque(maxlen=config.get_perf_history_runs()),
+        }
+    return st.session_state[STATE_KEY]
+
+
+def _new_run(kind):
+    timings = _timings()
+    timings['run_id'] += 1
+    timings['run_kind'] = kind
+    timings['stages'] = []
+    timings['open_stages'] = []
+
+
+def _close_run():
+    timings = _timings()
+    if timings['stages']:
+        timings['history'].append({'run': timings['run_id'], 'kind': timings['run_kind'], 'stages': timings['stages']})
+
+
+def start_run():
+    """
+    Marks the start of a full script run.
+    """
+    timings = _timings()
+    timings['run_start'] = time.perf_counter()
+    timings['in_full_run'] = True
+    _new_run("Full rerun")
+
+
+def end_run():
+    """
+    Marks the end of a full script run (runs ended by st.stop are not recorded).
+    """
+    timings = _timings()
+    if timings['run_start'] is not None:
+        timings['full_run'] = time.perf_counter() - timings['run_start']
+    timings['in_full_run'] = False
+    _close_run()
+
+
+@contextlib.contextmanager
+def stage(name, detail=None):
+    """
+    Times a step of the current run under `name`. `detail` (e.g. 'hit' / 'miss') can be
+    changed from inside the step with annotate(). Outside a script run (e.g. in the cache
+    warm-up thread) nothing is recorded.
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        yield
+        return
+    timings = _timings()
+    entry = {'stage': name, 'detail': detail, 'ms': None}
+    timings['open_stages'].append(entry)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry['ms'] = (time.perf_counter() - start) * 1000
+        timings['open_stages'].remove(entry)
+        timings['stages'].append(entry)
+
+
+def annotate(detail):
+    """
+    Sets the detail of the innermost open stage, e.g. annotate('miss') in the body of a
+    cached function (which only runs on a cache miss).
+    """
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return
+    open_stages = _timings()['open_stages']
+    if open_stages:
+        open_stages[-1]['detail'] = detail
+
+
+def timed_fragment(name):
+    """
+    Like st.fragment, but records the run time of the fragment under `name`.
+    An isolated rerun counts as a run of its own for the stage timings; afterwards
+    the timing panel (if one is shown) is redrawn.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _timings()
+            isolated = not timings['in_full_run']
+            if isolated:
+                _new_run(f"Fragment: {name}")
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            entry = timings['fragments'].setdefault(name, {'full': None, 'isolated': None})
+            entry['isolated' if isolated else 'full'] = time.perf_counter() - start
+            if isolated:
+                _close_run()
+                if timings['panel'] is not None:
+                    _draw_panel(timings['panel'])
+            return result
+        return st.fragment(wrapper)
+    return decorator
+
+
+def timings_frame() -> pd.DataFrame:
+    """
+    One row per fragment: time inside the last full rerun, time of its last isolated rerun
+    and the time saved by the isolated rerun compared to the last full rerun (ms).
+    """
+    timings = _timings()
+    full_run = timings['full_run']
+    rows = []
+    for name, entry in timings['fragments'].items():
+        isolated = entry['isolated']
+        rows.append({
+            'Fragment': name,
+            'In Full Run (ms)': entry['full'] * 1000 if entry['full'] is not None else None,
+            'Isolated Rerun (ms)': isolated * 1000 if isolated is not None else None,
+            'Saved (ms)': (full_run - isolated) * 1000 if full_run is not None and isolated is not None else None,
+        })
+    return pd.DataFrame(rows, columns=['Fragment', 'In Full Run (ms)', 'Isolated Rerun (ms)', 'Saved (ms)'])
+
+
+def history_frame() -> pd.DataFrame:
+    """
+    All recorded stages of the kept runs, one row per stage (oldest run first).
+    """
+    rows = [
+        {'Run': run['run'], 'Kind': run['kind'], 'Stage': s['stage'], 'Detail': s['detail'], 'ms': s['ms']}
+        for run in _timings()['history'] for s in run['stages']
+    ]
+    return pd.DataFrame(rows, columns=['Run', 'Kind', 'Stage', 'Detail', 'ms'])
+
+
+def stages_frame() -> pd.DataFrame:
+    """
+    Stages of the last recorded run with their time, next to the average time and count of
+    the same stage over the kept runs (ms).
+    """
+    columns = ['Stage', 'Detail', 'Last Run (ms)', 'Average (ms)', 'Runs']
+    history = history_frame()
+    if history.empty:
+        return pd.DataFrame(columns=columns)
+    averages = history.groupby('Stage')['ms'].agg(['mean', 'count'])
+    last = history[history['Run'] == history['Run'].iloc[-1]]
+    last = last.groupby(['Stage', 'Detail'], dropna=False, sort=False)['ms'].sum().reset_index()
+    return pd.DataFrame({
+        'Stage': last['Stage'],
+        'Detail': last['Detail'],
+        'Last Run (ms)': last['ms'],
+        'Average (ms)': last['Stage'].map(averages['mean']),
+        'Runs': last['Stage'].map(averages['count']),
+    }, columns=columns)
+
+
+def _draw_panel(slot):
+    timings = _timings()
+    with slot.container():
+        with st.expander("Render Timings"):
+            if timings['full_run'] is not None:
+                st.caption(f"Last full rerun: {timings['full_run'] * 1000:,.0f} ms")
+            st.dataframe(timings_frame().style.format(precision=0, na_rep="-"), hide_index=True, width="stretch")
+
+            history = timings['history']
+            if history:
+                st.caption(f"Stages of the last run ({history[-1]['kind']}), averages over the last {len(history)} runs")
+                st.dataframe(stages_frame().style.format(precision=1, na_rep="-"), hide_index=True, width="stretch")
+            # Also redrawn from isolated fragment reruns; widgets in containers outside the
+            # fragment (the sidebar slot) need Streamlit >= 1.59, see requirements.txt
+            if history:
+                st.download_button("Export Timings (CSV)", history_frame().to_csv(index=False),
+                                   file_name="render_timings.csv", mime="text/csv", width="stretch")
+
+
+def timing_panel(slot):
+    """
+    Draws the timing panel into `slot` (an st.empty) and remembers it, so isolated
+    fragment reruns can refresh it in place.
+    """
+    _timings()['panel'] = slot
+    _draw_panel(slot)
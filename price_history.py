@@ -0,0 +1,168 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from db_utils import get_price_history, save_price_history
+
+# BTC/ETH daily price history for buy-and-hold benchmark comparisons.
+# The candles are stored in the shared "price_history" table of the dashboard database and
+# updated incrementally (paginated fetch_ohlcv through the CCXT instances of trade_hl /
+# trade_bitget), so updates from the daily job on the CI runner reach the dashboard.
+# The dashboard only reads the table, so it never hits the exchange while rendering.
+
+ASSETS = ['BTC', 'ETH']
+
+# Perp symbols per exchange client
+SYMBOLS = {
+    'hyperliquid': {'BTC': 'BTC/USDC:USDC', 'ETH': 'ETH/USDC:USDC'},
+    'bitget': {'BTC': 'BTC/USDT:USDT', 'ETH': 'ETH/USDT:USDT'},
+}
+
+DAY_MS = 24 * 60 * 60 * 1000
+DEFAULT_START = "2023-01-01"
+
+
+def read_asset_history(asset: str) -> pd.DataFrame:
+    """
+    Returns the stored daily candles of one asset (columns: date_world, open, high, low, close, volume).
+    """
+    return get_price_history(config.get_dashboard_users_key(), asset)
+
+
+def fetch_ohlcv_paginated(exchange, symbol: str, since_ms: int, limit: int = 500, max_pages: int = 100):
+    """
+    Fetches daily candles from since_ms until now, one page of `limit` candles at a time.
+    """
+    candles = []
+    for _ in range(max_pages):
+        page = exchange.fetch_ohlcv(symbol, timeframe='1d', since=since_ms, limit=limit)
+        if not page:
+            break
+        candles.extend(page)
+        last_ts = page[-1][0]
+        if len(page) < limit or last_ts + DAY_MS > time.time() * 1000:
+            break
+        since_ms = last_ts + DAY_MS
+    return candles
+
+
+def update_asset_history(exchange, asset: str, symbol: str) -> int:
+    """
+    Stores new daily candles for one asset.
+    The last stored day is fetched again since it may have been an incomplete candle.
+    Returns the number of stored days.
+    """
+    existing = read_asset_history(asset)
+    if existing.empty:
+        since = pd.Timestamp(DEFAULT_START)
+    else:
+        since = pd.Timestamp(existing['date_world'].max())
+    since_ms = int(since.tz_localize('UTC').timestamp() * 1000)
+
+    candles = fetch_ohlcv_paginated(exchange, symbol, since_ms)
+    if candles:
+        new = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        # Align to date_world (daily 'YYYY-MM-DD' rows, UTC days)
+        new['date_world'] = pd.to_datetime(new['timestamp'], unit='ms').dt.normalize()
+        new = new.drop(columns='timestamp').drop_duplicates('date_world', keep='last')
+
+        if not save_price_history(config.get_dashboard_users_key(), asset, new):
+            raise RuntimeError(f"Could not store {asset} prices")
+        return len(set(pd.to_datetime(existing['date_world'])) | set(new['date_world']))
+
+    return len(existing)
+
+
+def update_price_history(client, user: str, exchange_name: str = 'hyperliquid'):
+    """
+    Updates the store for all benchmark assets through an existing trade_hl / trade_bitget client.
+    Returns (success, message) like run_data_loading.
+    """
+    try:
+        exchange = client.init_exchange(user)
+        if exchange is None:
+            return False, f"Prices: No {exchange_name} connection for {user}"
+
+        counts = []
+        for asset in ASSETS:
+            days = update_asset_history(exchange, asset, SYMBOLS[exchange_name][asset])
+            counts.append(f"{asset} {days} days")
+        return True, f"Prices: Updated ({', '.join(counts)})"
+    except Exception as e:
+        return False, f"Prices Error: {e}"
+
+
+def load_price_history(assets=ASSETS) -> pd.DataFrame:
+    """
+    Returns daily close prices from the store, indexed by date_world, one column per asset.
+    """
+    closes = {}
+    for asset in assets:
+        df = read_asset_history(asset)
+        if not df.empty:
+            closes[asset] = df.set_index(pd.to_datetime(df['date_world']))['close']
+    if not closes:
+        return pd.DataFrame()
+    return pd.DataFrame(closes).sort_index()
+
+
+def benchmark_equity(proc_df: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Buy-and-hold equity of each asset, starting with the account equity on the first day.
+    Returns a frame aligned to proc_df['date_world'] with one column per asset.
+    """
+    if proc_df.empty or prices.empty:
+        return pd.DataFrame()
+    aligned = prices.reindex(pd.DatetimeIndex(proc_df['date_world'])).ffill()
+    start_equity = proc_df['equity'].iloc[0]
+    # Days before an asset's first stored price stay empty; the first valid price is the base
+    return aligned / aligned.bfill().iloc[0] * start_equity
+
+
+def benchmark_metrics(proc_df: pd.DataFrame, prices: pd.DataFrame, pnl_col: str = 'net_pnl') -> pd.DataFrame:
+    """
+    Relative return, beta and annualized alpha of the account against each asset.
+    Account daily returns are PnL over the previous day's equity (deposits excluded).
+    Per asset, all figures cover the days with both an account return and a price.
+    All assets are computed at once on the aligned return matrix.
+    """
+    if len(proc_df) < 3 or prices.empty:
+        return pd.DataFrame()
+
+    dates = pd.DatetimeIndex(proc_df['date_world'])
+    equity = proc_df['equity'].to_numpy(dtype=float)
+    pnl = proc_df[pnl_col].to_numpy(dtype=float)
+
+    prev_equity = equity[:-1]
+    account_ret = np.divide(pnl[1:], prev_equity, out=np.full(len(prev_equity), np.nan), where=prev_equity != 0)
+
+    price_matrix = prices.reindex(dates).ffill().to_numpy(dtype=float)
+    bench_ret = price_matrix[1:] / price_matrix[:-1] - 1
+
+    valid = np.isfinite(account_ret)[:, None] & np.isfinite(bench_ret)
+    n = valid.sum(axis=0)
+
+    a = np.where(valid, account_ret[:, None], 0.0)
+    b = np.where(valid, bench_ret, 0.0)
+    mean_a = a.sum(axis=0) / np.maximum(n, 1)
+    mean_b = b.sum(axis=0) / np.maximum(n, 1)
+    cov = (np.where(valid, (a - mean_a) * (b - mean_b), 0.0)).sum(axis=0) / np.maximum(n - 1, 1)
+    var_b = (np.where(valid, (b - mean_b) ** 2, 0.0)).sum(axis=0) / np.maximum(n - 1, 1)
+    beta = np.divide(cov, var_b, out=np.full_like(cov, np.nan), where=var_b > 0)
+    alpha = (mean_a - beta * mean_b) * 365
+
+    # Both totals over the same days: those with an account return and a price for the asset
+    account_total = np.prod(np.where(valid, 1 + account_ret[:, None], 1.0), axis=0) - 1
+    bench_total = np.prod(np.where(valid, 1 + bench_ret, 1.0), axis=0) - 1
+
+    return pd.DataFrame({
+        'Benchmark': prices.columns,
+        'Account Return (%)': account_total * 100,
+        'Benchmark Return (%)': bench_total * 100,
+        'Relative Return (%)': (account_total - bench_total) * 100,
+        'Beta': beta,
+        'Alpha (ann. %)': alpha * 100,
+        'Days': n,
+    })
@@ -0,0 +1,89 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Block-bootstrap projection of the equity curve.
+# Future daily PnL is drawn from the historical daily net_pnl in blocks of consecutive days
+# (circular block bootstrap, keeps short-term autocorrelation). Path generation is vectorized
+# with numpy and sharded across a thread pool; numpy releases the GIL in the sampling, indexing
+# and cumsum of each shard, so shards run in parallel without copying the paths between
+# processes (or re-importing the Streamlit script in spawned workers). Only the quantile
+# bands are returned.
+
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+SHARD_SIZE = 5000          # paths per worker task
+MIN_PARALLEL_PATHS = 10000 # below this a single run on the calling thread is faster than the pool
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """
+    Lazily creates one thread pool per server process, shared by all sessions.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, min(4, (os.cpu_count() or 1) - 1))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="projection")
+    return _executor
+
+
+def _run_parallel(tasks):
+    """
+    Runs the shards on the thread pool.
+    """
+    return list(_get_executor().map(_simulate_shard, tasks))
+
+
+def simulate_paths(pnl: np.ndarray, n_paths: int, horizon: int, block_size: int, seed) -> np.ndarray:
+    """
+    Returns an (n_paths, horizon) float32 matrix of cumulative PnL paths.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(pnl)
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-horizon // block_size)
+
+    starts = rng.integers(0, n, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % n
+    draws = pnl[idx.reshape(n_paths, -1)[:, :horizon]]
+    return np.cumsum(draws, axis=1, dtype=np.float64).astype(np.float32)
+
+
+def _simulate_shard(args):
+    return simulate_paths(*args)
+
+
+def project_equity_bands(net_pnl, last_equity: float, last_date, horizon: int = 90,
+                         n_paths: int = 20000, block_size: int = 5, seed: int = 0,
+                         quantiles=QUANTILES) -> pd.DataFrame:
+    """
+    Projects the equity `horizon` days past last_date from the historical daily net_pnl.
+    Returns one row per future day with the equity quantiles (columns 'p5', 'p25', ...).
+    """
+    pnl = np.asarray(pd.Series(net_pnl).dropna(), dtype=np.float64)
+    if len(pnl) < 2 or horizon < 1:
+        return pd.DataFrame()
+
+    n_shards = max(1, -(-n_paths // SHARD_SIZE))
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    sizes = [SHARD_SIZE] * (n_shards - 1) + [n_paths - SHARD_SIZE * (n_shards - 1)]
+    tasks = [(pnl, size, horizon, block_size, s) for size, s in zip(sizes, seeds)]
+
+    if n_paths >= MIN_PARALLEL_PATHS and n_shards > 1:
+        paths = np.vstack(_run_parallel(tasks))
+    else:
+        paths = np.vstack([_simulate_shard(t) for t in tasks])
+
+    bands = np.quantile(paths, quantiles, axis=0) + float(last_equity)
+
+    dates = pd.date_range(pd.Timestamp(last_date) + pd.Timedelta(days=1), periods=horizon, freq='D')
+    result = pd.DataFrame({'date_world': dates})
+    for q, band in zip(quantiles, bands):
+        result[f"p{int(round(q * 100))}"] = band
+    return result
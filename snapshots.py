@@ -0,0 +1,204 @@
+import hashlib
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from db_utils import get_snapshot, get_snapshot_created, save_snapshot
+from dashboard_data import DerivedFrames
+from data_processing import process_account_data
+
+# Precomputed dashboard frames per user, written by daily_update.py after the data load.
+# For every strategy (and Total_Account) the snapshot holds the frames of the full-history view:
+# the processed daily frame, the weekly / monthly / quarterly rollups, the heatmap pivots and
+# the KPIs. They are computed with DerivedFrames itself, so they equal the live results.
+#
+# The dashboard only uses a snapshot if it was made from the same history it has loaded (a
+# hash of the raw rows up to the snapshot's last day). Rows added after that day, e.g. by a
+# LOAD DATA during the day, are processed live and appended to the snapshot frames.
+#
+# Snapshots are stored in the "<table>_snapshots" table next to the account table (written by
+# the daily job on the CI runner, read by the dashboard): a 'meta' row (JSON) and one Parquet
+# row '<strategy index>_<frame>' per frame, all tagged with the history version and replaced
+# in one transaction.
+
+FRAMES = ['processed', 'weekly', 'monthly', 'quarterly']
+PNL_COL = 'net_pnl'
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+
+
+def history_version(raw_df: pd.DataFrame, last_date) -> str:
+    """
+    Hash of the raw rows up to last_date. Independent of the row order (the table is read
+    without ORDER BY) and of whether date_world was already converted to datetime.
+    """
+    dates = pd.to_datetime(raw_df['date_world'])
+    rows = raw_df[dates <= pd.Timestamp(last_date)].assign(date_world=dates[dates <= pd.Timestamp(last_date)])
+    row_hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    return hashlib.sha1(np.sort(row_hashes).tobytes()).hexdigest()[:16]
+
+
+def _heatmap_long(heatmap) -> pd.DataFrame:
+    heatmap_pnl, heatmap_pct = heatmap
+    if heatmap_pnl.empty:
+        return pd.DataFrame(columns=['year', 'month', 'total_pnl', 'pct_return'])
+    return pd.DataFrame({
+        'total_pnl': heatmap_pnl.stack(),
+        'pct_return': heatmap_pct.stack(),
+    }).reset_index()
+
+
+def _heatmap_pivots(long_df: pd.DataFrame):
+    # Same pivots (and month order) as calculate_monthly_heatmap_data
+    if long_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    pnl_pivot = long_df.pivot(index='year', columns='month', values='total_pnl')
+    pct_pivot = long_df.pivot(index='year', columns='month', values='pct_return')
+    existing_months = [m for m in MONTHS if m in pnl_pivot.columns]
+    return pnl_pivot.reindex(columns=existing_months), pct_pivot.reindex(columns=existing_months)
+
+
+def _to_parquet(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def write_snapshot(user: str, table_name: str, raw_df: pd.DataFrame):
+    """
+    Computes and stores the snapshot of one user's table.
+    Returns (success, message) like run_data_loading.
+    """
+    try:
+        if raw_df.empty:
+            return False, f"Snapshot: No data in {table_name}"
+
+        raw_df = raw_df.copy()
+        raw_df['date_world'] = pd.to_datetime(raw_df['date_world'])
+        last_date = raw_df['date_world'].max()
+        strategies = ["Total_Account"] + sorted(raw_df['strategy'].unique().tolist())
+
+        payloads = {}
+        kpis = []
+        for i, strategy in enumerate(strategies):
+            frames = DerivedFrames(raw_df, "snapshot", strategy=strategy, pnl_col=PNL_COL)
+            for name in FRAMES:
+                payloads[f"{i}_{name}"] = _to_parquet(frames.get(name))
+            payloads[f"{i}_heatmap"] = _to_parquet(_heatmap_long(frames.get('heatmap')))
+
+            processed = frames.get('processed')
+            kpis.append({
+                'strategy': strategy,
+                'last_date': processed['date_world'].iloc[-1].strftime('%Y-%m-%d'),
+                'balance': float(processed['equity'].iloc[-1]),
+                'total_pnl': float(processed[PNL_COL].sum()),
+            })
+
+        meta = {
+            'table': table_name,
+            'created': pd.Timestamp.now(tz='UTC').isoformat(),
+            'last_date': last_date.strftime('%Y-%m-%d'),
+            'history_version': history_version(raw_df, last_date),
+            'pnl_col': PNL_COL,
+            'strategies': strategies,
+            'kpis': kpis,
+        }
+        payloads['meta'] = json.dumps(meta).encode()
+
+        if not save_snapshot(user, table_name, meta['history_version'], payloads):
+            return False, f"Snapshot: Could not store the snapshot of {table_name}"
+        return True, f"Snapshot: {table_name} up to {meta['last_date']} ({len(strategies)} views)"
+    except Exception as e:
+        return False, f"Snapshot Error: {e}"
+
+
+def read_snapshot(user: str, table_name: str, raw_df: pd.DataFrame):
+    """
+    Returns the stored snapshot of a table if it matches raw_df (see Snapshot), else None.
+    """
+    if raw_df.empty:
+        return None
+    payloads = get_snapshot(user, table_name)
+    if 'meta' not in payloads:
+        return None
+    meta = json.loads(payloads.pop('meta'))
+    if history_version(raw_df, meta['last_date']) != meta['history_version']:
+        return None
+    return Snapshot(meta, payloads, raw_df)
+
+
+def snapshot_created(user: str, table_name: str):
+    """
+    When the snapshot of a table was written (None if there is none). Changes whenever
+    daily_update.py writes a new snapshot, i.e. after every data load.
+    """
+    return get_snapshot_created(user, table_name)
+
+
+class Snapshot():
+    '''
+    Stored frames of one table, bound to the raw history they were checked against.
+    Frames are decoded from their stored Parquet payloads on first use; they are shared and
+    must be treated as read-only.
+    '''
+
+    def __init__(self, meta: dict, payloads: dict, raw_df: pd.DataFrame):
+        self.meta = meta
+        self._payloads = payloads
+        self.pnl_col = meta['pnl_col']
+        self.last_date = pd.Timestamp(meta['last_date'])
+        self._index = {strategy: i for i, strategy in enumerate(meta['strategies'])}
+        self._frames = {}
+
+        # Rows added since the snapshot was made
+        dates = pd.to_datetime(raw_df['date_world'])
+        self.new_rows = raw_df[dates > self.last_date].assign(date_world=dates[dates > self.last_date])
+
+    def has(self, strategy: str) -> bool:
+        return strategy in self._index
+
+    @property
+    def current(self) -> bool:
+        """
+        True if no rows were added since the snapshot, so its rollups are complete.
+        """
+        return self.new_rows.empty
+
+    def _read(self, strategy: str, name: str) -> pd.DataFrame:
+        key = (strategy, name)
+        if key not in self._frames:
+            payload = self._payloads[f"{self._index[strategy]}_{name}"]
+            self._frames[key] = pd.read_parquet(io.BytesIO(payload))
+        return self._frames[key]
+
+    def frame(self, strategy: str, name: str):
+        """
+        Stored rollup ('weekly', 'monthly', 'quarterly') or heatmap pivots ('heatmap') of the full-history view.
+        """
+        if name == 'heatmap':
+            return _heatmap_pivots(self._read(strategy, name))
+        return self._read(strategy, name)
+
+    def processed(self, strategy: str) -> pd.DataFrame:
+        """
+        The processed daily frame: stored days plus the new days processed live.
+        """
+        stored = self._read(strategy, 'processed')
+        if self.current:
+            return stored
+        new_rows = self.new_rows
+        if strategy != "Total_Account":
+            new_rows = new_rows[new_rows['strategy'] == strategy]
+        if new_rows.empty:
+            return stored
+        combined = pd.concat([stored, process_account_data(new_rows.copy(), strategy)], ignore_index=True)
+        combined['cum_pnl'] = combined['net_pnl'].cumsum()
+        return combined
+
+    def kpis(self, strategy: str) -> dict:
+        """
+        Last date, balance and total PnL of the view on the snapshot's last day.
+        """
+        return self.meta['kpis'][self._index[strategy]]
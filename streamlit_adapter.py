@@ -0,0 +1,35 @@
+import logging
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Thin Streamlit layer over the headless core (config, db_utils, data_loading, price_history and
+# the exchange clients). The core reports problems through return values and logging; errors
+# logged while a dashboard script runs are shown on the page, where the core used to call st.error.
+
+CORE_LOGGERS = ['db_utils', 'data_loading', 'price_history', 'bitget', 'hl']
+
+
+class StreamlitErrorHandler(logging.Handler):
+    '''
+    Shows log records as st.error in the session whose script run logged them.
+    Records from other threads (no script run context) are left to the other handlers.
+    '''
+
+    def emit(self, record):
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return
+        try:
+            st.error(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+def install(level=logging.ERROR):
+    """
+    Attaches the handler to the core loggers (once per process).
+    """
+    for name in CORE_LOGGERS:
+        logger = logging.getLogger(name)
+        if not any(isinstance(h, StreamlitErrorHandler) for h in logger.handlers):
+            logger.addHandler(StreamlitErrorHandler(level=level))
@@ -0,0 +1,206 @@
+import argparse
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Synthetic account histories with the same schema that db_utils.insert_account_data writes.
+# Used for benchmarks and load testing. Output is deterministic for a given seed: every
+# (user, strategy) series has its own RNG stream, so chunking does not change the data.
+#
+# CLI (N users x M strategies x D days):
+#   python synthetic_data.py --users 3 --strategies 50 --days 1825 --format csv --output synthetic.csv
+#   python synthetic_data.py --users 3 --strategies 50 --days 1825 --format parquet --output "synthetic_{user}.parquet"
+#   python synthetic_data.py --users 3 --strategies 50 --days 1825 --format db --table "load_test_{user}" --create-table
+# A {user} placeholder in --output / --table writes one file / table per user (e.g. user1, user2).
+
+COLUMNS = ['date_world', 'collateral', 'strategy', 'total_pnl', 'deposit', 'withdrawal',
+           'btc_pnl', 'eth_pnl', 'user_id', 'pos_size']
+
+
+def generate_strategy_history(user_idx: int, strategy_idx: int, n_days: int, seed: int = 0,
+                              start_date: str = "2023-01-01", volatility: float = 0.02,
+                              deposit_prob: float = 0.01, gap_prob: float = 0.0,
+                              initial_collateral: float = 10000.0) -> pd.DataFrame:
+    """
+    Generates the daily rows of one strategy for one user.
+    Collateral moves with a random daily return (std = volatility) plus deposits/withdrawals.
+    total_pnl is the balance change incl. deposits, matching what data_loading records.
+    gap_prob drops random days, like days where the loader did not run.
+    """
+    rng = np.random.default_rng([seed, user_idx, strategy_idx])
+
+    returns = rng.normal(0.0005, volatility, n_days)
+    deposits = np.where(rng.random(n_days) < deposit_prob,
+                        np.round(rng.uniform(0.05, 0.5, n_days) * initial_collateral, 2), 0.0)
+    withdrawals = np.where(rng.random(n_days) < deposit_prob / 2,
+                           np.round(rng.uniform(0.01, 0.1, n_days) * initial_collateral, 2), 0.0)
+
+    # Compounded equity path with flows added after the day's trading result:
+    # b[i] = b[i-1] * (1 + r[i]) + flow[i]  =>  b[i] = growth[i] * (b0 + cumsum(flow / growth)[i])
+    growth = np.cumprod(1 + returns)
+    collateral = growth * (initial_collateral + np.cumsum((deposits - withdrawals) / growth))
+    prev_collateral = np.concatenate(([initial_collateral], collateral[:-1]))
+    trading_pnl = prev_collateral * returns
+
+    btc_share = rng.uniform(0.2, 0.6)
+    eth_share = rng.uniform(0.1, 0.3)
+    noise = rng.normal(0, volatility / 4, n_days) * collateral
+
+    df = pd.DataFrame({
+        'date_world': pd.date_range(start_date, periods=n_days, freq='D').strftime('%Y-%m-%d'),
+        'collateral': np.round(collateral, 2),
+        'strategy': f"Strategy_{strategy_idx + 1}",
+        'total_pnl': np.round(trading_pnl + deposits - withdrawals, 2),
+        'deposit': deposits,
+        'withdrawal': withdrawals,
+        'btc_pnl': np.round(trading_pnl * btc_share + noise, 2),
+        'eth_pnl': np.round(trading_pnl * eth_share - noise, 2),
+        'user_id': f"user{user_idx + 1}",
+        'pos_size': np.round(collateral * rng.uniform(0.5, 3.0, n_days), 2),
+    }, columns=COLUMNS)
+
+    if gap_prob > 0:
+        df = df[rng.random(n_days) >= gap_prob].reset_index(drop=True)
+
+    return df
+
+
+def iter_account_history(n_users: int, n_strategies: int, n_days: int, seed: int = 0, **kwargs):
+    """
+    Yields (user_idx, DataFrame) chunks, one per user and strategy, so large tables
+    can be written without holding everything in memory.
+    """
+    for user_idx in range(n_users):
+        for strategy_idx in range(n_strategies):
+            yield user_idx, generate_strategy_history(user_idx, strategy_idx, n_days, seed=seed, **kwargs)
+
+
+def generate_account_history(n_strategies: int, n_days: int, user_idx: int = 0, seed: int = 0,
+                             **kwargs) -> pd.DataFrame:
+    """
+    Returns the full raw table of one user (all strategies), as fetch_data would.
+    """
+    frames = [generate_strategy_history(user_idx, s, n_days, seed=seed, **kwargs)
+              for s in range(n_strategies)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _per_user(chunks, target: str):
+    """
+    Groups the chunk stream by target path/table. Without a {user} placeholder everything
+    goes to a single target.
+    """
+    if "{user}" not in target:
+        yield target, (df for _, df in chunks)
+        return
+    for user_idx, group in itertools.groupby(chunks, key=lambda item: item[0]):
+        yield target.format(user=f"user{user_idx + 1}"), (df for _, df in group)
+
+
+def write_csv(chunks, output: str):
+    """
+    Streams the chunks to CSV; only one chunk is held in memory at a time.
+    """
+    total = 0
+    for path, frames in _per_user(chunks, output):
+        with open(path, "w", newline="") as f:
+            for i, df in enumerate(frames):
+                df.to_csv(f, index=False, header=(i == 0))
+                total += len(df)
+        print(f"Wrote {path}")
+    return total
+
+
+def write_parquet(chunks, output: str):
+    """
+    Streams the chunks to Parquet, one row group per chunk (requires pyarrow).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    total = 0
+    for path, frames in _per_user(chunks, output):
+        writer = None
+        try:
+            for df in frames:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                writer.write_table(table)
+                total += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+        print(f"Wrote {path}")
+    return total
+
+
+def write_db(chunks, table: str, db_key: str, create_table: bool = False):
+    """
+    Bulk loads the chunks into DB tables with COPY (see db_utils.bulk_copy_account_data).
+    """
+    import db_utils
+
+    total = 0
+    for table_name, frames in _per_user(chunks, table):
+        if create_table and not db_utils.create_account_table(db_key, table_name):
+            raise RuntimeError(f"Could not create table {table_name}")
+        written = db_utils.bulk_copy_account_data(db_key, frames, table_name)
+        if written is None:
+            raise RuntimeError(f"Bulk load into {table_name} failed")
+        total += written
+        print(f"Loaded {written:,} rows into {table_name}")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic account histories for load and scale testing.")
+    parser.add_argument("--users", type=int, default=1, help="Number of users (N)")
+    parser.add_argument("--strategies", type=int, default=5, help="Strategies per user (M)")
+    parser.add_argument("--days", type=int, default=365, help="Days of history (D)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; same seed gives the same data")
+    parser.add_argument("--start-date", default="2023-01-01")
+    parser.add_argument("--volatility", type=float, default=0.02, help="Daily return standard deviation")
+    parser.add_argument("--deposit-prob", type=float, default=0.01, help="Daily probability of a deposit")
+    parser.add_argument("--gap-prob", type=float, default=0.0, help="Daily probability of a missing row")
+    parser.add_argument("--initial-collateral", type=float, default=10000.0)
+    parser.add_argument("--format", choices=["csv", "parquet", "db"], default="csv")
+    parser.add_argument("--output", help="Output file for csv/parquet (supports {user})")
+    parser.add_argument("--table", help="Target table for db (supports {user})")
+    parser.add_argument("--db-key", help="Credential key for db (default: DASHBOARD_DB_USER)")
+    parser.add_argument("--create-table", action="store_true", help="Create the target table(s) if missing")
+    args = parser.parse_args(argv)
+
+    chunks = iter_account_history(
+        args.users, args.strategies, args.days, seed=args.seed,
+        start_date=args.start_date, volatility=args.volatility,
+        deposit_prob=args.deposit_prob, gap_prob=args.gap_prob,
+        initial_collateral=args.initial_collateral,
+    )
+
+    if args.format == "db":
+        if not args.table:
+            parser.error("--table is required for --format db")
+        import config
+        db_key = args.db_key or config.get_dashboard_users_key()
+        total = write_db(chunks, args.table, db_key, create_table=args.create_table)
+    else:
+        if not args.output:
+            parser.error(f"--output is required for --format {args.format}")
+        out_dir = os.path.dirname(args.output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        if args.format == "csv":
+            total = write_csv(chunks, args.output)
+        else:
+            total = write_parquet(chunks, args.output)
+
+    print(f"Generated {total:,} rows ({args.users} users x {args.strategies} strategies x {args.days} days)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
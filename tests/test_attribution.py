@@ -0,0 +1,50 @@
+import os
+import sys
+import warnings
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attribution import attribution_by_strategy, attribution_for_view, COMPONENTS
+from synthetic_data import generate_account_history
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return generate_account_history(3, 200, gap_prob=0.1)
+
+
+def test_components_add_up(raw):
+    attr = attribution_by_strategy(raw, 'ME')
+    assert (attr[COMPONENTS].sum(axis=1) - attr['net_pnl']).abs().max() < 1e-6
+    net = (raw['total_pnl'].fillna(0) - raw['deposit'].fillna(0)).sum()
+    assert attr['net_pnl'].sum() == pytest.approx(net)
+
+
+def test_start_date_filter_without_chained_assignment(raw):
+    start = pd.to_datetime(raw['date_world']).min() + pd.Timedelta(days=50)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        attr = attribution_by_strategy(raw, 'W', start_date=start)
+    assert attr['date_world'].min() >= start
+    assert (attr['date_world'].dt.dayofweek == 6).all()
+
+
+def test_empty_and_unknown_frequency(raw):
+    empty = attribution_by_strategy(raw.iloc[:0])
+    assert empty.empty and list(empty.columns) == ['date_world', 'strategy', 'net_pnl'] + COMPONENTS
+    assert attribution_for_view(empty).empty
+    with pytest.raises(ValueError):
+        attribution_by_strategy(raw, 'H')
+
+
+def test_view_total_and_strategy(raw):
+    attr = attribution_by_strategy(raw, 'Q')
+    total = attribution_for_view(attr)
+    assert set(total['component']) == {'BTC', 'ETH', 'Residual'}
+    assert total['pnl'].sum() == pytest.approx(attr[COMPONENTS].to_numpy().sum())
+    strategy = attr['strategy'].iloc[0]
+    one = attribution_for_view(attr, strategy)
+    assert one['pnl'].sum() == pytest.approx(attr.loc[attr['strategy'] == strategy, COMPONENTS].to_numpy().sum())
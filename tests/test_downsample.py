@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downsample import lttb_indices, minmax_indices, downsample, aggregate_bars
+
+
+def test_lttb_keeps_first_last_and_spike():
+    y = np.zeros(1000)
+    y[500] = 100.0
+    picks = lttb_indices(np.arange(1000), y, 50)
+    assert len(picks) == 50
+    assert picks[0] == 0 and picks[-1] == 999
+    assert 500 in picks
+    assert np.all(np.diff(picks) > 0)
+
+
+def test_lttb_short_series_unchanged():
+    assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+    assert lttb_indices(np.arange(0), np.arange(0), 10).tolist() == []
+
+
+def test_lttb_datetimes_and_nan():
+    x = pd.date_range("2024-01-01", periods=300).to_numpy()
+    y = np.random.default_rng(0).normal(size=300)
+    y[10] = np.nan
+    picks = lttb_indices(x, y, 30)
+    assert len(picks) == 30 and picks[0] == 0 and picks[-1] == 299
+
+
+def test_minmax_keeps_extremes_in_order():
+    y = np.sin(np.linspace(0, 20, 2000))
+    y[1234] = 5.0
+    y[321] = -5.0
+    picks = minmax_indices(y, 20)
+    assert 1234 in picks and 321 in picks
+    assert np.all(np.diff(picks) > 0)
+    assert len(picks) <= 2 * 20 + 2
+
+
+def test_downsample_frames():
+    df = pd.DataFrame({'x': np.arange(100), 'y': np.arange(100.0)})
+    assert downsample(df, 'x', 'y', 200) is df
+    assert len(downsample(df, 'x', 'y', 10)) == 10
+    assert len(downsample(df, 'x', 'y', 10, method='minmax')) <= 10
+    empty = df.iloc[:0]
+    assert downsample(empty, 'x', 'y', 10).empty
+
+
+def test_aggregate_bars_sum_and_last():
+    df = pd.DataFrame({'x': np.arange(10), 'y': np.ones(10)})
+    bars, size = aggregate_bars(df, 'x', 'y', 4, agg='sum')
+    assert size == 3
+    assert bars['x'].tolist() == [2, 5, 8, 9]
+    assert bars['y'].tolist() == [3.0, 3.0, 3.0, 1.0]
+    assert bars['y'].sum() == df['y'].sum()
+
+    cum = df.assign(y=df['y'].cumsum())
+    bars, _ = aggregate_bars(cum, 'x', 'y', 4, agg='last')
+    assert bars['y'].iloc[-1] == cum['y'].iloc[-1]
+
+    bars, size = aggregate_bars(df.iloc[:0], 'x', 'y', 4)
+    assert bars.empty and size == 1
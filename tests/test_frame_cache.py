@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard_data import FrameCache, DerivedFrames, _nbytes
+from synthetic_data import generate_account_history
+
+
+def frame(rows):
+    return pd.DataFrame({'a': np.zeros(rows)})
+
+
+def test_evicts_least_recently_used_by_bytes():
+    size = _nbytes(frame(100))
+    cache = FrameCache(3 * size)
+    for key in "abc":
+        cache[key] = frame(100)
+    cache['a']  # 'b' is now the least recently used
+    cache['d'] = frame(100)
+    assert 'b' not in cache
+    assert all(k in cache for k in "acd")
+    assert cache.nbytes == 3 * size
+
+    cache['e'] = frame(200)
+    assert len(cache) == 2 and 'e' in cache and 'd' in cache
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_oversized_value_and_replacement():
+    size = _nbytes(frame(100))
+    cache = FrameCache(size)
+    cache['big'] = frame(1000)
+    assert 'big' not in cache and cache.nbytes == 0
+
+    cache['a'] = frame(10)
+    cache['a'] = frame(100)
+    assert len(cache) == 1 and cache.nbytes == size
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_nbytes_counts_object_columns_and_tuples():
+    strings = pd.DataFrame({'s': pd.Series(["strategy_name_" + str(i) for i in range(100)], dtype=object)})
+    assert _nbytes(strings) > strings.memory_usage(index=True, deep=False).sum()
+    assert _nbytes((strings, strings)) == 2 * _nbytes(strings)
+    assert _nbytes(None) == 0
+
+
+def test_derived_frames_shared_memo():
+    raw = generate_account_history(2, 60)
+    memo = FrameCache(64 * 1024 * 1024)
+    first = DerivedFrames(raw, "v1", memo=memo)
+    weekly = first.get('weekly')
+    second = DerivedFrames(raw, "v1", memo=memo)
+    assert second.get('weekly') is weekly
+    later = DerivedFrames(raw, "v1", memo=memo, start_date=pd.Timestamp("2099-01-01"))
+    assert later.get('processed') is first.get('processed')
+    assert later.get('proc').empty
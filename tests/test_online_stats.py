@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from online_stats import OnlineStats
+
+
+def test_matches_batch_statistics():
+    rng = np.random.default_rng(1)
+    pnl = rng.normal(10, 50, size=200)
+    equity = 10_000 + np.cumsum(pnl)
+    stats = OnlineStats()
+    for date, e, p in zip(pd.date_range("2024-01-01", periods=200), equity, pnl):
+        assert stats.update(date, e, p)
+
+    assert stats.count == 200
+    assert stats.mean == pytest.approx(pnl.mean())
+    assert stats.variance == pytest.approx(pnl.var(ddof=1))
+    peak = np.maximum.accumulate(equity)
+    assert stats.max_drawdown == pytest.approx(((equity - peak) / peak).min())
+    assert stats.current_drawdown == pytest.approx((equity[-1] - peak[-1]) / peak[-1])
+
+
+def test_same_day_replaces_and_older_day_is_ignored():
+    stats = OnlineStats()
+    stats.update("2024-01-01", 1000, 0)
+    stats.update("2024-01-02", 1100, 100)
+    stats.update("2024-01-02", 900, -100)
+    assert stats.count == 2
+    assert stats.mean == pytest.approx(-50)
+    assert stats.last_equity == 900
+    assert stats.update("2023-12-31", 1, 1) is False
+    assert stats.count == 2
+
+
+def test_json_roundtrip_keeps_same_day_undo():
+    stats = OnlineStats()
+    stats.update("2024-01-01", 1000, 0)
+    stats.update("2024-01-02", 1100, 100)
+    restored = OnlineStats.from_json(stats.to_json())
+    restored.update("2024-01-02", 1050, 50)
+    stats.update("2024-01-02", 1050, 50)
+    assert restored.to_dict() == stats.to_dict()
+
+
+def test_empty_state():
+    stats = OnlineStats.from_json("")
+    assert stats.count == 0
+    assert stats.variance == 0.0
+    assert stats.current_drawdown == 0.0
+    assert stats.ewma_vol == 0.0
+    assert OnlineStats.from_history(pd.DataFrame()).count == 0
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processing import pivot_strategy_equity
+
+
+def rows(equity, days=3):
+    dates = pd.date_range("2024-01-01", periods=days)
+    return pd.DataFrame([
+        {'date_world': d.strftime('%Y-%m-%d'), 'strategy': s, 'collateral': c}
+        for d in dates for s, c in equity.items()
+    ])
+
+
+def test_empty():
+    assert pivot_strategy_equity(pd.DataFrame()).empty
+
+
+def test_top_n_groups_the_rest():
+    matrix = pivot_strategy_equity(rows({'A': 10, 'B': 30, 'C': 20, 'D': 1}), top_n=2)
+    assert list(matrix.columns) == ['B', 'C', 'Other (2 strategies)']
+    assert (matrix['Other (2 strategies)'] == 11).all()
+    assert (matrix.sum(axis=1) == 61).all()
+
+
+def test_top_n_ties_keep_alphabetical_order():
+    matrix = pivot_strategy_equity(rows({'D': 5, 'C': 5, 'B': 5, 'A': 5}), top_n=2)
+    assert list(matrix.columns) == ['A', 'B', 'Other (2 strategies)']
+
+
+def test_grouped_column_never_replaces_a_strategy():
+    matrix = pivot_strategy_equity(rows({'Other': 100, 'Other (1 strategy)': 50, 'A': 1}), top_n=2)
+    assert list(matrix.columns) == ['Other', 'Other (1 strategy)', 'Other (1 strategy)*']
+    assert (matrix['Other'] == 100).all()
+
+
+def test_missing_days_start_date_and_resample():
+    df = rows({'A': 1, 'B': 2}, days=10)
+    df = df[~((df['strategy'] == 'B') & (df['date_world'] == '2024-01-05'))]
+    original = df.copy()
+    matrix = pivot_strategy_equity(df)
+    assert matrix.loc['2024-01-05', 'B'] == 0
+    assert matrix.index.min() == pd.Timestamp('2024-01-01')
+
+    later = pivot_strategy_equity(df, start_date='2024-01-08')
+    assert later.index.min() == pd.Timestamp('2024-01-08') and len(later) == 3
+
+    weekly = pivot_strategy_equity(df, freq='W')
+    assert list(weekly.index) == [pd.Timestamp('2024-01-07'), pd.Timestamp('2024-01-14')]
+    # The input frame is not modified
+    pd.testing.assert_frame_equal(df, original)
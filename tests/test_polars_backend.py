@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processing import process_account_data, resample_data, calculate_monthly_heatmap_data
+from synthetic_data import generate_account_history
+
+# The polars backend must return exactly what the pandas backend returns
+pytest.importorskip("polars")
+
+
+@pytest.fixture(scope="module")
+def raw():
+    # Two years, with missing days like days where the loader did not run
+    return generate_account_history(5, 730, gap_prob=0.1)
+
+
+@pytest.fixture(scope="module")
+def proc(raw):
+    return process_account_data(raw.copy(), "Total_Account", backend="pandas")
+
+
+@pytest.mark.parametrize("strategy", ["Total_Account", "Strategy_2"])
+def test_process_account_data(raw, strategy):
+    expected = process_account_data(raw.copy(), strategy, backend="pandas")
+    result = process_account_data(raw.copy(), strategy, backend="polars")
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("freq", ["D", "W", "ME", "QE", "YE"])
+def test_resample_data(proc, freq):
+    expected = resample_data(proc, freq, backend="pandas")
+    result = resample_data(proc, freq, backend="polars")
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_calculate_monthly_heatmap_data(proc):
+    expected = calculate_monthly_heatmap_data(proc, "net_pnl", backend="pandas")
+    result = calculate_monthly_heatmap_data(proc, "net_pnl", backend="polars")
+    for res, exp in zip(result, expected):
+        pd.testing.assert_frame_equal(res, exp)
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from projection import project_equity_bands, simulate_paths
+
+
+def test_simulate_paths_shape_and_seed():
+    pnl = np.arange(10, dtype=float)
+    a = simulate_paths(pnl, 100, 30, 5, 0)
+    assert a.shape == (100, 30) and a.dtype == np.float32
+    assert np.array_equal(a, simulate_paths(pnl, 100, 30, 5, 0))
+    # Block larger than the history is clipped to it
+    assert simulate_paths(pnl, 10, 30, 50, 0).shape == (10, 30)
+
+
+def test_bands_ordered_and_deterministic():
+    pnl = np.random.default_rng(0).normal(5, 20, size=300)
+    bands = project_equity_bands(pnl, 1000.0, "2024-06-30", horizon=30, n_paths=20000)
+    assert len(bands) == 30
+    assert bands['date_world'].iloc[0] == pd.Timestamp("2024-07-01")
+    quantiles = bands[['p5', 'p25', 'p50', 'p75', 'p95']].to_numpy()
+    assert np.all(np.diff(quantiles, axis=1) >= 0)
+    again = project_equity_bands(pnl, 1000.0, "2024-06-30", horizon=30, n_paths=20000)
+    pd.testing.assert_frame_equal(bands, again)
+
+
+def test_constant_pnl_is_exact():
+    bands = project_equity_bands([10.0] * 20, 100.0, "2024-01-01", horizon=5, n_paths=500)
+    assert np.allclose(bands['p5'], [110, 120, 130, 140, 150])
+    assert np.allclose(bands['p95'], bands['p5'])
+
+
+def test_too_short_history_or_horizon():
+    assert project_equity_bands([1.0], 100.0, "2024-01-01").empty
+    assert project_equity_bands([1.0, np.nan, 2.0], 100.0, "2024-01-01", horizon=0).empty